@@ -0,0 +1,44 @@
+# backend/app/db/catalog_version.py
+
+from sqlalchemy import text
+
+# 카탈로그(장소 / 장소 사진)가 바뀔 때마다 1씩 올라가는 번호 (추천 캐시 무효화용)
+CATALOG_VERSION_TABLE = "catalog_version"
+CATALOG_TABLES = ("places", "place_images")
+
+def ensure_catalog_version(engine):
+    """
+    버전 행(1행짜리 테이블) + places/place_images 에 쓰기가 있을 때마다 버전을 올리는 트리거
+    (서버 시작 / 시딩 / 마이그레이션 / backfill_mood 때마다, 여러 번 해도 안전)
+    트리거라서 시딩, 센트로이드 재계산, 저장 형식 변환, 무드 백필, 직접 고친 SQL 까지 다 잡힘
+    문장(statement) 단위라 한 번에 여러 행을 고쳐도 버전 행 업데이트는 한 번
+    """
+    with engine.connect() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {CATALOG_VERSION_TABLE} ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), version BIGINT NOT NULL DEFAULT 0)"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {CATALOG_VERSION_TABLE} (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"
+        ))
+        conn.execute(text(
+            "CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$ "
+            f"BEGIN UPDATE {CATALOG_VERSION_TABLE} SET version = version + 1 WHERE id = 1; RETURN NULL; END "
+            "$$ LANGUAGE plpgsql"
+        ))
+        for table in CATALOG_TABLES:
+            trigger = f"tr_{table}_catalog_version"
+            conn.execute(text(
+                "DO $$ BEGIN "
+                f"IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = '{trigger}' AND tgrelid = '{table}'::regclass) THEN "
+                f"CREATE TRIGGER {trigger} AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+                "FOR EACH STATEMENT EXECUTE PROCEDURE bump_catalog_version(); "
+                "END IF; END $$"
+            ))
+        conn.commit()
+
+def read_catalog_version(db):
+    """
+    지금 카탈로그 버전 (버전 행 하나만 읽음 - 장소 수와 상관없이 가벼움)
+    """
+    return db.execute(text(f"SELECT version FROM {CATALOG_VERSION_TABLE} WHERE id = 1")).scalar()
@@ -0,0 +1,30 @@
+# backend/app/db/embedding_storage.py
+
+import os
+from pgvector.sqlalchemy import Vector, HALFVEC
+
+# 장소/사진 임베딩 저장 형식
+# - EMBEDDING_STORAGE: vector(fp32, 기본) / halfvec(fp16, 용량·인덱스 절반)
+# - EMBEDDING_PCA_DIM: 0 이면 CLIP 512차원 그대로, 128~256 이면 카탈로그로 학습한 PCA 투영 차원
+#   (투영 행렬은 migrate_embedding_storage.py 가 학습해서 EMBEDDING_PCA_PATH 에 저장)
+# 바꾼 뒤에는 반드시 migrate_embedding_storage.py 로 기존 행을 변환해야 함
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "vector")
+EMBEDDING_PCA_DIM = int(os.getenv("EMBEDDING_PCA_DIM", "0"))
+
+CLIP_DIM = 512
+EMBEDDING_DIM = EMBEDDING_PCA_DIM or CLIP_DIM
+
+if EMBEDDING_STORAGE not in ("vector", "halfvec"):
+    raise ValueError(f"지원하지 않는 임베딩 저장 형식: {EMBEDDING_STORAGE} (vector / halfvec)")
+
+def embedding_type(storage=EMBEDDING_STORAGE, dim=EMBEDDING_DIM):
+    """
+    embedding 컬럼 / 쿼리 벡터 캐스트에 쓰는 pgvector 타입
+    """
+    return HALFVEC(dim) if storage == "halfvec" else Vector(dim)
+
+def embedding_opclass(storage=EMBEDDING_STORAGE):
+    """
+    코사인 거리 ANN 인덱스 연산자 클래스 (저장 형식마다 다름)
+    """
+    return "halfvec_cosine_ops" if storage == "halfvec" else "vector_cosine_ops"
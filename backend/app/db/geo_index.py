@@ -0,0 +1,19 @@
+# backend/app/db/geo_index.py
+
+from sqlalchemy import text
+
+GEO_INDEX_NAME = "ix_places_earth"
+
+def ensure_geo_index(engine):
+    """
+    places 위도/경도 공간 인덱스 (PostgreSQL 기본 확장 cube + earthdistance 사용)
+    검색 쿼리의 ll_to_earth(places.latitude, places.longitude) 식과 똑같아야 인덱스를 탐
+    """
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS cube"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS earthdistance"))
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {GEO_INDEX_NAME} ON places "
+            "USING gist (ll_to_earth(latitude, longitude))"
+        ))
+        conn.commit()
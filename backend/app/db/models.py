@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, Text, BigInteger, ForeignKey, DateTime, UniqueConstraint
-from pgvector.sqlalchemy import Vector  
-from sqlalchemy.orm import declarative_base, relationship
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import declarative_base, relationship, deferred
 from datetime import datetime
+from app.db.embedding_storage import embedding_type, CLIP_DIM
 
 Base = declarative_base()
 
@@ -10,18 +11,53 @@ class Place(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)       # 장소 이름 (예: 성심당)
-    description = Column(Text)              # 설명
-    image_path = Column(String)             # 이미지 파일 위치
+    description = Column(Text)              # 설명 (대표 사진 설명)
+    image_path = Column(String)             # 대표 이미지 파일 위치
     
     address = Column(String)       # 주소
     latitude = Column(Float)       # 위도 
     longitude = Column(Float)      # 경도 
 
-    embedding = Column(Vector(512)) 
+    embedding = Column(embedding_type())     # 장소 사진 임베딩들의 정규화된 평균 (centroid)
+    mood = Column(String, index=True)   # 시딩 때 계산한 무드 태그 (예: 자연/힐링)
+
+    images = relationship("PlaceImage", back_populates="place", order_by="PlaceImage.id")
 
     def __repr__(self):
         return f"<Place(name={self.name})>"
 
+# 장소 한 곳에 딸린 사진별 임베딩 (장소 정보는 places 에 한 번만 저장)
+class PlaceImage(Base):
+    __tablename__ = "place_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    place_id = Column(Integer, ForeignKey("places.id"), index=True)
+    description = Column(Text)              # 사진 설명
+    image_path = Column(String)             # 이미지 파일 위치
+
+    embedding = Column(embedding_type())   # EMBEDDING_STORAGE / EMBEDDING_PCA_DIM 에 따라 vector 또는 halfvec
+    mood = Column(String, index=True)       # 사진별 무드 태그
+
+    place = relationship("Place", back_populates="images")
+
+    def __repr__(self):
+        return f"<PlaceImage(place_id={self.place_id})>"
+
+# 장소별로 미리 계산해 둔 가장 비슷한 장소 top-k ("비슷한 장소" 화면용, build_place_neighbors.py)
+class PlaceNeighbor(Base):
+    __tablename__ = "place_neighbors"
+    __table_args__ = (UniqueConstraint("place_id", "rank", name="uq_place_neighbors_place_rank"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    place_id = Column(Integer, ForeignKey("places.id"), index=True)
+    neighbor_id = Column(Integer, ForeignKey("places.id"))
+    rank = Column(Integer)                  # 1부터 가까운 순
+    distance = Column(Float)                # 두 장소 centroid 임베딩의 코사인 거리
+    mood = Column(String)                   # 이웃 장소의 무드 태그
+    source_hash = Column(String)            # 계산할 때 place 임베딩 해시 (바뀌면 다시 계산)
+
+    neighbor = relationship("Place", foreign_keys=[neighbor_id])
+
 class User(Base):
     __tablename__ = "users"
 
@@ -32,6 +68,13 @@ class User(Base):
     email = Column(String, nullable=True) # 이메일
     created_at = Column(String) # 가입 시간
 
+    # 취향 벡터: 분석/방문/장소 사진 임베딩의 가중 평균 (CLIP 512차원 그대로, 검색할 때 저장 형식으로 투영)
+    # (deferred: /users 처럼 사용자 목록을 불러올 때는 벡터를 안 읽음)
+    taste_vector = deferred(Column(Vector(CLIP_DIM), nullable=True))
+    taste_weight = Column(Float, default=0.0)           # 지금까지 반영한 가중치 합 (TASTE_MAX_WEIGHT 로 상한)
+    taste_mood = Column(String, nullable=True)          # 취향 벡터의 무드 태그
+    taste_updated_at = Column(DateTime, nullable=True)
+
     visits = relationship("Visit", back_populates="user")
 
 # 방문 인증을 위한 모델
@@ -0,0 +1,13 @@
+# backend/app/db/mood_column.py
+
+from sqlalchemy import text
+
+def ensure_mood_column(engine):
+    """
+    기존 places 테이블에 mood 컬럼과 인덱스가 없으면 추가 (서버 시작 / 시딩 / backfill_mood 때마다, 여러 번 해도 안전)
+    (create_all은 이미 있는 테이블에 컬럼을 추가해주지 않음)
+    """
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE places ADD COLUMN IF NOT EXISTS mood VARCHAR"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_places_mood ON places (mood)"))
+        conn.commit()
@@ -0,0 +1,84 @@
+# backend/app/db/vector_index.py
+
+import os
+from sqlalchemy import text
+from app.db.embedding_storage import embedding_opclass
+
+# places / place_images 의 embedding ANN 인덱스 설정
+# - VECTOR_INDEX_TYPE: hnsw(기본) / ivfflat / none
+# - 빌드 파라미터: HNSW_M, HNSW_EF_CONSTRUCTION, IVFFLAT_LISTS
+# - 검색 파라미터 (세션마다 적용): HNSW_EF_SEARCH, IVFFLAT_PROBES
+#   값이 클수록 재현율(recall)이 오르고 느려짐
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "hnsw")
+HNSW_M = int(os.getenv("HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "64"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+IVFFLAT_LISTS = int(os.getenv("IVFFLAT_LISTS", "100"))
+IVFFLAT_PROBES = int(os.getenv("IVFFLAT_PROBES", "10"))
+# pgvector 0.8+ : 무드 필터로 후보가 모자라면 인덱스를 더 훑게 함 (off / relaxed_order / strict_order)
+VECTOR_ITERATIVE_SCAN = os.getenv("VECTOR_ITERATIVE_SCAN", "off")
+
+# 벡터 인덱스를 거는 테이블 (장소 centroid / 사진별 임베딩)
+VECTOR_TABLES = ("places", "place_images")
+COLUMN_NAME = "embedding"
+OPCLASS = embedding_opclass()   # vector_cosine_ops / halfvec_cosine_ops
+
+def _index_name(table_name):
+    return f"ix_{table_name}_embedding"
+
+def _create_index_sql(table_name, index_name, index_type=VECTOR_INDEX_TYPE, concurrently=False):
+    using = "CONCURRENTLY " if concurrently else ""
+    if index_type == "hnsw":
+        method = "hnsw"
+        params = f"m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}"
+    elif index_type == "ivfflat":
+        method = "ivfflat"
+        params = f"lists = {IVFFLAT_LISTS}"
+    else:
+        raise ValueError(f"지원하지 않는 벡터 인덱스 종류: {index_type} (hnsw / ivfflat / none)")
+    return (
+        f"CREATE INDEX {using}IF NOT EXISTS {index_name} ON {table_name} "
+        f"USING {method} ({COLUMN_NAME} {OPCLASS}) WITH ({params})"
+    )
+
+def ensure_vector_index(engine, index_type=VECTOR_INDEX_TYPE, tables=VECTOR_TABLES):
+    """
+    인덱스가 없으면 생성 (이미 있으면 아무것도 안 함)
+    """
+    if index_type == "none":
+        return
+    with engine.connect() as conn:
+        for table_name in tables:
+            conn.execute(text(_create_index_sql(table_name, _index_name(table_name), index_type)))
+        conn.commit()
+
+def rebuild_vector_index(engine, index_type=VECTOR_INDEX_TYPE, tables=VECTOR_TABLES):
+    """
+    대량 시딩 뒤 인덱스 재생성 (CONCURRENTLY 라 재생성 중에도 검색/쓰기가 막히지 않음)
+    새 인덱스를 임시 이름으로 만든 뒤 기존 인덱스를 지우고 이름을 바꿈
+    """
+    # CONCURRENTLY 는 트랜잭션 안에서 못 돌려서 autocommit 으로 실행
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table_name in tables:
+            index_name = _index_name(table_name)
+            new_name = f"{index_name}_new"
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {new_name}"))
+            if index_type == "none":
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+                continue
+            conn.execute(text(_create_index_sql(table_name, new_name, index_type, concurrently=True)))
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+            conn.execute(text(f"ALTER INDEX {new_name} RENAME TO {index_name}"))
+
+def apply_search_settings(db, index_type=VECTOR_INDEX_TYPE):
+    """
+    현재 트랜잭션에만 검색 파라미터 적용 (SET LOCAL - 커밋/롤백하면 원래대로)
+    """
+    if index_type == "hnsw":
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {HNSW_EF_SEARCH}"))
+        if VECTOR_ITERATIVE_SCAN != "off":
+            db.execute(text(f"SET LOCAL hnsw.iterative_scan = {VECTOR_ITERATIVE_SCAN}"))
+    elif index_type == "ivfflat":
+        db.execute(text(f"SET LOCAL ivfflat.probes = {IVFFLAT_PROBES}"))
+        if VECTOR_ITERATIVE_SCAN != "off":
+            db.execute(text(f"SET LOCAL ivfflat.iterative_scan = {VECTOR_ITERATIVE_SCAN}"))
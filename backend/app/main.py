@@ -3,18 +3,36 @@ import uuid
 from typing import List, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv   
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 import httpx 
 from jose import jwt 
 import boto3 
 
-from app.services.ai_service import ai_instance
-from app.services.recommend_service import recommend_service
-from app.db.models import Place, User, Visit, Route, RoutePlace, PlacePhoto, Base
-from app.utils import calculate_distance, sort_by_shortest_path
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse
+
+from app.services.ai_service import get_ai_service, is_ai_service_loaded
+from app.services.recommend_service import (
+    recommend_service, embedding_scheduler, warm_up_worker, worker_warmup_info, GEO_SCORING_ENABLED
+)
+from app.services.inference_executor import inference_executor, InferenceQueueFull
+from app.services.recommendation_cache import recommendation_cache
+from app.services.taste_service import (
+    taste_service, ensure_taste_columns, TASTE_ANALYZE_WEIGHT, TASTE_PHOTO_WEIGHT, TASTE_VISIT_WEIGHT
+)
+from app.db.models import Place, PlaceNeighbor, User, Visit, Route, RoutePlace, PlacePhoto, Base
+from app.db.mood_column import ensure_mood_column
+from app.db.geo_index import ensure_geo_index
+from app.db.catalog_version import ensure_catalog_version
+from app.geo import haversine_one_to_many
+from app.services.route_optimizer import optimize_route, ROUTE_SOLVER
+from app.services.itinerary_scheduler import schedule_itinerary
+from app.services.travel_matrix import travel_matrix
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 import uvicorn
@@ -34,6 +52,9 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
 AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2") 
 
+# 서버 시작 때 모델 로딩 + 워밍업을 미리 할지 (0이면 첫 요청 때 로딩)
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "1") == "1"
+
 if not DATABASE_URL:
     print("❌ 에러: .env 파일을 못 찾거나 DATABASE_URL이 없음")
 
@@ -49,7 +70,47 @@ try:
 except Exception as e:
     print(f"❌ S3 연결 실패: {e}")
 
-app = FastAPI()
+# 모델 준비 상태 (/health/ready 에서 사용)
+# MODEL_PRELOAD=0 이면 미리 기다릴 워밍업이 없으니 처음부터 ready (워커마다 첫 일을 받을 때 로딩 + 워밍업)
+model_state = {"ready": not MODEL_PRELOAD, "preload": MODEL_PRELOAD, "warmup_seconds": None, "error": None}
+
+async def preload_models():
+    """
+    추론 실행기의 워커마다 모델 로딩 + 워밍업 (그동안 다른 API는 정상 응답)
+    워밍업은 워커 initializer(warm_up_worker)가 하고, 여기선 서로 다른 워커 전부가 응답할 때까지 확인
+    (작업을 workers 개 넣는 것만으로는 빠른 워커 하나가 여러 개를 가져갈 수 있음)
+    """
+    try:
+        print("🔥 모델 워밍업 시작...")
+        warmed = {}
+        while len(warmed) < inference_executor.workers:
+            infos = await asyncio.gather(*[
+                inference_executor.run(worker_warmup_info)
+                for _ in range(inference_executor.workers - len(warmed))
+            ])
+            before = len(warmed)
+            warmed.update(infos)
+            if len(warmed) == before:
+                await asyncio.sleep(0.2)     # 아직 initializer 가 도는 워커가 있음
+        model_state["warmup_seconds"] = round(max(seconds or 0.0 for seconds in warmed.values()), 3)
+        model_state["ready"] = True
+        print(f"✅ 모델 워밍업 완료! ({model_state['warmup_seconds']}초)")
+    except Exception as e:
+        model_state["error"] = str(e)
+        print(f"❌ 모델 워밍업 실패: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if MODEL_PRELOAD:
+        # 워커가 뜰 때마다 그 워커 안에서 모델 로딩 + 워밍업 (풀이 만들어지기 전에 지정)
+        inference_executor.initializer = warm_up_worker
+    preload_task = asyncio.create_task(preload_models()) if MODEL_PRELOAD else None
+    yield
+    if preload_task is not None and not preload_task.done():
+        preload_task.cancel()
+    inference_executor.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # 2. CORS 설정
 origins = [
@@ -68,6 +129,12 @@ app.add_middleware(
 # 3. DB 세션 설정
 engine = create_engine(DATABASE_URL)
 Base.metadata.create_all(bind=engine)
+ensure_mood_column(engine)
+ensure_taste_columns(engine)
+ensure_catalog_version(engine)
+if GEO_SCORING_ENABLED:
+    # 거리 가산점 쿼리의 ll_to_earth 함수(cube/earthdistance 확장) + GiST 인덱스 (기존 DB에도)
+    ensure_geo_index(engine)
 SessionLocal = sessionmaker(bind=engine)
 
 def get_db():
@@ -105,6 +172,40 @@ def upload_to_s3(file: UploadFile) -> str:
 
 # 토큰 인증을 위한 스킴 정의
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/kakao")
+# 로그인하지 않아도 되는 API용 (토큰이 있으면 사용자 취향에 반영)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/kakao", auto_error=False)
+
+def get_optional_user_id(token: Optional[str]) -> Optional[int]:
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload.get("sub"))
+    except Exception:
+        return None
+
+async def update_taste_from_photo(user_id: int, contents: bytes, weight: float):
+    """
+    응답을 보낸 뒤(BackgroundTasks) 사진을 임베딩해서 사용자 취향 벡터에 반영
+    """
+    try:
+        analyzed = await embedding_scheduler.submit_many([contents])
+    except Exception as e:
+        print(f"⚠️ 취향 벡터 갱신 실패 (user {user_id}): {e}")
+        return
+    await update_taste_from_vectors(user_id, [v for v, _ in analyzed], weight)
+
+async def update_taste_from_vectors(user_id: int, vectors: list, weight: float):
+    """
+    응답을 보낸 뒤(BackgroundTasks) 이미 만든 임베딩들을 사용자 취향 벡터에 반영
+    """
+    db = SessionLocal()
+    try:
+        await taste_service.record(db, user_id, vectors, weight)
+    except Exception as e:
+        print(f"⚠️ 취향 벡터 갱신 실패 (user {user_id}): {e}")
+    finally:
+        db.close()
 
 class KakaoAuthRequest(BaseModel):
     code: str 
@@ -124,16 +225,24 @@ class RoutePlaceSchema(BaseModel):
     name: Optional[str] = None
     lat: float
     lng: float
+    open_time: Optional[str] = None         # 여는 시각 "HH:MM" (start_time 을 보낼 때만 사용, 예: "08:00")
+    close_time: Optional[str] = None        # 닫는 시각 "HH:MM" (예: "22:00")
+    dwell_min: Optional[int] = None         # 머무는 시간 (분, 없으면 ITINERARY_DEFAULT_DWELL_MIN)
 
 class RouteRequest(BaseModel):
     start_lat: float
     start_lng: float
     places: List[RoutePlaceSchema]
+    return_to_start: bool = False           # True면 마지막 장소에서 출발지로 돌아오는 경로
+    solver: Optional[str] = None            # auto / exact / local / greedy (없으면 ROUTE_SOLVER)
+    start_time: Optional[str] = None        # "HH:MM" 을 보내면 영업시간/머무는 시간을 지키는 일정으로 계산
+    end_time: Optional[str] = None          # 일정이 끝나야 하는 시각 (없으면 ITINERARY_DAY_END)
 
 class RouteResponse(BaseModel):
     status: str
     start_point: dict
     data: list
+    summary: Optional[dict] = None
 
 class RoutePlacePayload(BaseModel):
     id: Optional[int] = None
@@ -280,10 +389,59 @@ async def kakao_login(auth_req: KakaoAuthRequest, db: Session = Depends(get_db))
 def read_root():
     return {"message": "🍞 대전 유잼 탐지기 서버 정상 가동 중! 🍞"}
 
+@app.get("/health/ready")
+def readiness_check():
+    """
+    모델 로딩 + 워밍업이 끝났을 때만 200 (로드밸런서/배포 readiness probe용)
+    MODEL_PRELOAD=0 이면 첫 요청 때 로딩하므로 항상 200
+    """
+    if not model_state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "loading", **model_state})
+    return {"status": "ready", **model_state}
+
+@app.get("/stats/embedding-cache")
+def get_embedding_cache_stats():
+    """
+    업로드 이미지 임베딩 캐시 적중/미스 통계
+    """
+    if not is_ai_service_loaded():
+        return {"status": "success", "cache": None}
+    return {"status": "success", "cache": get_ai_service().cache.stats()}
+
+@app.get("/stats/recommendation-cache")
+def get_recommendation_cache_stats():
+    """
+    추천 결과 캐시 적중/미스 통계
+    """
+    return {"status": "success", "cache": recommendation_cache.stats()}
+
+@app.get("/stats/inference")
+def get_inference_stats():
+    """
+    CLIP 추론 실행기 상태 (풀 종류, 동시 실행 수, 대기 중인 작업 수)
+    """
+    return {"status": "success", "executor": inference_executor.stats()}
+
+@app.get("/stats/batching")
+def get_batching_stats():
+    """
+    마이크로 배칭 스케줄러 통계 (배치 크기 분포, 대기 시간)
+    """
+    return {"status": "success", "scheduler": embedding_scheduler.stats()}
+
+@app.get("/stats/travel-matrix")
+def get_travel_matrix_stats():
+    """
+    지금 워커가 쓰고 있는 이동 행렬 버전 / 장소 수
+    """
+    return {"status": "success", "matrix": travel_matrix.stats()}
+
 @app.post("/route", response_model=RouteResponse)
 def calculate_route(req: RouteRequest):
     """
-    장소 좌표 리스트를 받아 최적(가까운 순) 경로로 정렬해 반환.
+    장소 좌표 리스트를 받아 총 이동 거리가 가장 짧은 경로로 정렬해 반환.
+    (열린 경로 / 출발지 복귀 둘 다 가능)
+    start_time 을 보내면 영업시간 / 머무는 시간을 지키는 시각표까지 계산 (못 넣는 곳은 summary.unscheduled)
     """
     if not req.places:
         return {"status": "fail", "message": "places가 비어 있습니다."}
@@ -298,11 +456,29 @@ def calculate_route(req: RouteRequest):
         for p in req.places
     ]
 
-    sorted_places = sort_by_shortest_path(req.start_lat, req.start_lng, places_payload)
+    try:
+        if req.start_time:
+            for payload, p in zip(places_payload, req.places):
+                payload.update(open_time=p.open_time, close_time=p.close_time, dwell_min=p.dwell_min)
+            sorted_places, summary = schedule_itinerary(
+                req.start_lat, req.start_lng, places_payload, req.start_time,
+                end_time=req.end_time,
+                return_to_start=req.return_to_start,
+            )
+        else:
+            sorted_places, summary = optimize_route(
+                req.start_lat, req.start_lng, places_payload,
+                return_to_start=req.return_to_start,
+                solver=req.solver or ROUTE_SOLVER,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return {
         "status": "success",
         "start_point": {"lat": req.start_lat, "lng": req.start_lng},
         "data": sorted_places,
+        "summary": summary,
     }
 
 @app.post("/routes")
@@ -408,16 +584,30 @@ def delete_route_history(
 
 @app.post("/analyze")
 async def analyze_image(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     current_lat: float = Form(36.3325), 
     current_lng: float = Form(127.4342),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     print(f"📸 분석 시작... (사진 {len(files)}장)")
     
-    sorted_recommendations = await recommend_service.get_recommendations(
-        db, files, current_lat, current_lng
-    )
+    try:
+        queries = await recommend_service.analyze_uploads(files)
+    except InferenceQueueFull as e:
+        print(f"⏳ {e}")
+        raise HTTPException(status_code=503, detail="분석 요청이 많아요. 잠시 후 다시 시도해주세요.")
+
+    # 로그인한 사용자면 분석한 사진들을 응답 뒤에 취향 벡터에 반영 (이미 만든 벡터라 추가 추론 없음)
+    user_id = get_optional_user_id(token)
+    if user_id is not None:
+        background_tasks.add_task(
+            update_taste_from_vectors, user_id, [v for v, _ in queries], TASTE_ANALYZE_WEIGHT
+        )
+
+    # 검색 + 경로 계산(도로망 탐색 포함)은 CPU 작업이라 이벤트 루프 밖에서
+    sorted_recommendations = await run_in_threadpool(recommend_service.recommend, db, queries, current_lat, current_lng)
 
     if not sorted_recommendations:
         return {"status": "fail", "message": "비슷한 곳을 못 찾겠어요 😭"}
@@ -428,14 +618,45 @@ async def analyze_image(
         "data": sorted_recommendations 
     }
 
+# 💝 내 취향 추천 (저장된 취향 벡터로 검색 - 사진 업로드/CLIP 추론 없음)
+@app.get("/recommendations/me")
+def get_my_recommendations(
+    current_lat: float = 36.3325,
+    current_lng: float = 127.4342,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except Exception:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다.")
+
+    queries = taste_service.get_query(db, user_id)
+    if queries is None:
+        return {"status": "fail", "message": "아직 취향을 알 수 없어요. 사진을 분석하거나 방문 인증을 해주세요!"}
+
+    sorted_recommendations = recommend_service.recommend(db, queries, current_lat, current_lng)
+    if not sorted_recommendations:
+        return {"status": "fail", "message": "비슷한 곳을 못 찾겠어요 😭"}
+
+    return {
+        "status": "success",
+        "start_point": {"lat": current_lat, "lng": current_lng},
+        "taste_mood": queries[0][1],
+        "data": sorted_recommendations
+    }
+
 # 🚩 방문 인증 (나만의 지도 만들기 - S3 저장 적용!)
 @app.post("/visits")
 def verify_visit(
+    background_tasks: BackgroundTasks,
     user_id: int = Form(...),
     place_id: int = Form(...),
     lat: float = Form(...),
     lng: float = Form(...),
     file: UploadFile = File(...),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
     db: Session = Depends(get_db)
 ):
     """
@@ -448,7 +669,7 @@ def verify_visit(
         raise HTTPException(status_code=404, detail="장소를 찾을 수 없습니다.")
 
     # 2. 거리 검증
-    distance = calculate_distance(lat, lng, target_place.latitude, target_place.longitude)
+    distance = float(haversine_one_to_many(lat, lng, [target_place.latitude], [target_place.longitude])[0])
     print(f"📍 현재 위치와 {target_place.name} 거리: {distance:.2f}km")
 
     if distance > 0.5: 
@@ -470,6 +691,12 @@ def verify_visit(
     )
     db.add(new_visit)
     db.commit()
+
+    # 5. 인증샷을 취향 벡터에 반영 (응답 뒤에 임베딩해서 인증 응답은 느려지지 않음)
+    #    폼의 user_id 는 아무나 보낼 수 있어서 토큰 주인과 같을 때만 (남의 취향 벡터를 바꾸지 못하게)
+    if get_optional_user_id(token) == user_id:
+        file.file.seek(0)
+        background_tasks.add_task(update_taste_from_photo, user_id, file.file.read(), TASTE_VISIT_WEIGHT)
     
     return {
         "status": "success", 
@@ -480,6 +707,7 @@ def verify_visit(
 @app.post("/places/{place_id}/photo", response_model=PlacePhotoResponse)
 def upload_place_photo(
     place_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
@@ -516,6 +744,10 @@ def upload_place_photo(
 
     db.commit()
 
+    # 올린 사진을 취향 벡터에 반영 (응답 뒤에 임베딩)
+    file.file.seek(0)
+    background_tasks.add_task(update_taste_from_photo, user_id, file.file.read(), TASTE_PHOTO_WEIGHT)
+
     return {"status": "success", "place_id": place_id, "image_url": uploaded_image_url}
 
 @app.get("/places/{place_id}/photo", response_model=PlacePhotoResponse)
@@ -543,6 +775,48 @@ def get_place_photo(
 
     return {"status": "success", "place_id": place_id, "image_url": photo.image_url}
 
+# 🔗 비슷한 장소 (place_neighbors 에 미리 계산해 둔 목록에서 바로 조회)
+@app.get("/places/{place_id}/similar")
+def get_similar_places(
+    place_id: int,
+    limit: int = 10,
+    same_mood: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    장소 상세 화면의 "비슷한 장소" 목록. 벡터 검색 없이 build_place_neighbors.py 결과를 읽음.
+    same_mood=true 면 이 장소와 무드가 같은 곳만.
+    """
+    place = db.query(Place).filter(Place.id == place_id).first()
+    if not place:
+        raise HTTPException(status_code=404, detail="장소를 찾을 수 없습니다.")
+
+    query = (
+        db.query(PlaceNeighbor, Place)
+        .join(Place, PlaceNeighbor.neighbor_id == Place.id)
+        .filter(PlaceNeighbor.place_id == place_id)
+    )
+    if same_mood:
+        query = query.filter(PlaceNeighbor.mood == place.mood)
+    results = query.order_by(PlaceNeighbor.rank).limit(limit).all()
+
+    similar_places = [
+        {
+            "id": neighbor.id,
+            "name": neighbor.name,
+            "description": neighbor.description,
+            "address": neighbor.address,
+            "image_url": neighbor.image_path,
+            "lat": neighbor.latitude,
+            "lng": neighbor.longitude,
+            "similarity": row.distance,
+            "place_mood": row.mood
+        }
+        for row, neighbor in results
+    ]
+
+    return {"status": "success", "place_id": place_id, "mood": place.mood, "data": similar_places}
+
 @app.get("/places/photos", response_model=PlacePhotoListResponse)
 def get_place_photos(
     token: str = Depends(oauth2_scheme),
@@ -1,45 +1,151 @@
 # backend/app/services/ai_service.py
 
-from transformers import CLIPProcessor, CLIPModel
 from PIL import Image
 import io
-import torch
+import os
+import threading
+
+from app.services.embedding_cache import EmbeddingCache
+from app.services.image_decode import decode_image, IMAGE_DECODE_SIZE, IMAGE_MAX_PIXELS
+
+# torch / transformers 는 import 만으로 수 초가 걸려서 모델을 실제로 올릴 때 가져옴
+# (DB 스크립트처럼 AI를 안 쓰는 곳은 빠르게 import 되도록)
+
+MODEL_NAME = "openai/clip-vit-base-patch32"
+
+# 모델 로딩 방식
+# - full: CLIPModel 전체 (텍스트 타워 포함)
+# - vision: 이미지 인코더 + 투영층만 (무드 텍스트 임베딩은 미리 뽑아둔 파일 사용)
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "full")
+# 가중치 정밀도 (float32 / bfloat16 / float16)
+MODEL_DTYPE = os.getenv("MODEL_DTYPE", "float32")
+
+# CLIP 이미지 인코더 실행 방식 (app/services/inference_backends.py)
+# - eager: 기본 PyTorch
+# - compile: torch.compile 로 그래프 최적화
+# - onnx: export_backend.py 로 뽑은 (int8 동적 양자화) ONNX Runtime 그래프
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "eager")
+
+# 업로드 이미지 임베딩 캐시 설정 (디스크 경로를 비우면 메모리만 사용)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR") or None
 
 class AIService:
-    def __init__(self):
-        print("🤖 HuggingFace AI 모델(CLIP) 로딩 중...")
+    def __init__(self, model_name=MODEL_NAME, backend=INFERENCE_BACKEND, load_mode=MODEL_LOAD_MODE, dtype=MODEL_DTYPE):
+        import torch
+        from transformers import CLIPProcessor, CLIPModel, CLIPImageProcessor, CLIPVisionModelWithProjection
+        from app.services.inference_backends import VisionEncoder, create_backend
+
+        print(f"🤖 HuggingFace AI 모델(CLIP) 로딩 중... (백엔드: {backend}, 모드: {load_mode}, 정밀도: {dtype})")
+        self.model_name = model_name
+        torch_dtype = getattr(torch, dtype)
+
         # 여기가 바로 Hugging Face에서 모델을 가져오는 부분입니다.
-        self.model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32")
-        self.processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+        if load_mode == "full":
+            self.model = CLIPModel.from_pretrained(model_name, torch_dtype=torch_dtype)
+            self.processor = CLIPProcessor.from_pretrained(model_name)
+        elif load_mode == "vision":
+            # 텍스트 트랜스포머는 아예 안 올림 (메모리 절약)
+            self.model = CLIPVisionModelWithProjection.from_pretrained(model_name, torch_dtype=torch_dtype)
+            self.processor = CLIPImageProcessor.from_pretrained(model_name)
+        else:
+            raise ValueError(f"지원하지 않는 모델 로딩 모드: {load_mode} (full / vision)")
+        self.model.eval()
+        self.has_text_tower = load_mode == "full"
+
+        # 이미지 인코더는 설정한 백엔드(eager / compile / onnx)로 실행
+        self.backend = create_backend(backend, VisionEncoder(self.model.vision_model, self.model.visual_projection))
+        # 백엔드/정밀도/디코딩 설정(축소 크기, 최대 화소)마다 벡터가 달라서 캐시 키에 같이 넣음
+        # (설정을 바꾸면 디스크 캐시에 남은 예전 디코딩 경로의 벡터는 안 쓰임)
+        namespace = f"{model_name}:{self.backend.name}:{dtype}:decode{IMAGE_DECODE_SIZE}:max{IMAGE_MAX_PIXELS}"
+        self.cache = EmbeddingCache(namespace, max_items=EMBEDDING_CACHE_SIZE, disk_dir=EMBEDDING_CACHE_DIR)
         print("✅ 모델 장착 완료!")
 
     def image_to_vector(self, image_bytes):
+        # 한 장짜리도 배치 경로를 그대로 탄다
+        return self.images_to_vectors([image_bytes])[0]
+
+    def images_to_vectors(self, images_bytes, use_cache=True):
+        """
+        여러 장의 이미지를 한 번의 forward pass로 벡터화
+        images_bytes: bytes 또는 파일 객체(UploadFile.file 등)의 리스트
+        return: 입력 순서와 같은 길이의 리스트 (실패한 이미지는 None)
+        """
+        vectors = [None] * len(images_bytes)
+
+        # 0. 이미 본 사진이면 캐시에서 바로 꺼내기
+        cache_keys = [self.cache.make_key(image_bytes) if use_cache else None for image_bytes in images_bytes]
+
+        # 1. 바이트 형태의 이미지들을 열기 (깨진 파일은 건너뜀)
+        images = []
+        valid_indices = []
+        for idx, image_bytes in enumerate(images_bytes):
+            cached = self.cache.get(cache_keys[idx]) if use_cache else None
+            if cached is not None:
+                vectors[idx] = cached
+                continue
+            try:
+                # 작은 크기로 바로 디코딩 (draft 축소 + EXIF 회전 + 초대형 이미지 거절)
+                image = decode_image(image_bytes)
+            except Exception as e:
+                print(f"❌ 이미지 디코딩 실패 ({idx}번째): {e}")
+                continue
+            images.append(image)
+            valid_indices.append(idx)
+
+        if not images:
+            return vectors
+
         try:
-            # 1. 바이트 형태의 이미지를 열기
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # 2. AI가 이해할 수 있게 변환 (전처리)
-            inputs = self.processor(images=image, return_tensors="pt")
-            
-            # 3. 벡터 추출 (특징 뽑아내기)
-            with torch.no_grad():
-                outputs = self.model.get_image_features(**inputs)
-
-            # 4. 결과 텐서 추출 (transformers 버전에 따라 타입이 다를 수 있음)
-            if hasattr(outputs, "pooler_output"):
-                image_features = outputs.pooler_output
-            elif isinstance(outputs, (tuple, list)):
-                image_features = outputs[0]
-            else:
-                image_features = outputs
-
-            # 이 모델은 숫자 512개짜리 벡터를 반환
-            vector = image_features[0].tolist()
-            return vector
-            
+            # 2. AI가 이해할 수 있게 한꺼번에 변환 (전처리) -> [N, 3, 224, 224]
+            inputs = self.processor(images=images, return_tensors="pt")
+
+            # 3. 벡터 추출 (배치 한 번에 특징 뽑아내기)
+            image_features = self.backend.encode(inputs["pixel_values"])
+
+            # 4. 이 모델은 이미지마다 숫자 512개짜리 벡터를 반환
+            for idx, feature in zip(valid_indices, image_features.tolist()):
+                vectors[idx] = feature
+                if use_cache:
+                    self.cache.put(cache_keys[idx], feature)
+            return vectors
+
         except Exception as e:
             print(f"❌ AI 변환 중 에러 발생: {e}")
-            return None
+            return vectors
+
+    def warm_up(self):
+        """
+        더미 이미지로 한 번 추론해서 첫 요청이 메모리 할당/초기화 비용을 내지 않게 함
+        """
+        buffer = io.BytesIO()
+        Image.new("RGB", (224, 224), color=(128, 128, 128)).save(buffer, format="JPEG")
+        return self.images_to_vectors([buffer.getvalue()], use_cache=False)[0]
+
+_ai_service = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service():
+    """
+    모델은 처음 쓸 때 한 번만 로딩 (여러 스레드가 동시에 불러도 한 번)
+    """
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                _ai_service = AIService()
+    return _ai_service
+
+def is_ai_service_loaded():
+    return _ai_service is not None
+
+class _LazyAIService:
+    """
+    ai_instance.image_to_vector(...) 처럼 기존 코드 그대로 쓸 수 있게
+    속성에 처음 접근할 때 모델을 로딩하는 대리 객체
+    """
+    def __getattr__(self, name):
+        return getattr(get_ai_service(), name)
 
-# 이 변수를 다른 파일에서 가져다 씁니다
-ai_instance = AIService()
+# 이 변수를 다른 파일에서 가져다 씁니다 (실제 로딩은 처음 쓸 때)
+ai_instance = _LazyAIService()
@@ -0,0 +1,148 @@
+# backend/app/services/batch_scheduler.py
+
+import os
+import time
+import asyncio
+from collections import Counter
+
+from app.services.inference_executor import inference_executor, InferenceQueueFull
+
+# 마이크로 배칭 설정
+# - BATCH_MAX_SIZE: 한 번에 모델에 넣을 최대 이미지 수
+# - BATCH_MAX_WAIT_MS: 첫 이미지가 들어온 뒤 다른 요청을 기다려주는 최대 시간
+# - BATCH_MAX_QUEUE: 배치를 기다리는 이미지 최대 개수 (넘으면 바로 거절)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "5"))
+BATCH_MAX_QUEUE = int(os.getenv("BATCH_MAX_QUEUE", "256"))
+
+class BatchScheduler:
+    """
+    동시에 들어온 여러 요청의 이미지를 잠깐 모아서 한 번에 추론하는 스케줄러
+    batch_fn(items) -> results 는 입력과 같은 순서/길이의 결과를 돌려줘야 하고,
+    추론 실행기에서 돌기 때문에 process 모드에선 모듈 최상위 함수여야 함
+    """
+    def __init__(self, batch_fn, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS,
+                 max_queue=BATCH_MAX_QUEUE, executor=inference_executor):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue = max(self.max_batch_size, max_queue)
+        self.executor = executor
+
+        self._queue = []          # (item, future, 들어온 시각)
+        self._wakeup = None       # 배치가 꽉 찼을 때 기다림을 끊어주는 이벤트
+        self._slots = None        # 동시에 돌릴 배치 수 (= 실행기 워커 수)
+        self._flush_task = None
+        self._batch_tasks = set()  # 실행 중인 배치 태스크 (참조를 안 들고 있으면 도중에 GC 될 수 있음)
+
+        # 통계
+        self._batches = 0
+        self._items = 0
+        self._size_histogram = Counter()
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    async def submit_many(self, items: list) -> list:
+        """
+        이미지 여러 개를 대기열에 넣고, 각자의 결과를 입력 순서대로 돌려받음
+        """
+        if not items:
+            return []
+        if len(self._queue) + len(items) > self.max_queue:
+            raise InferenceQueueFull(f"배치 대기열이 가득 찼습니다 ({len(self._queue)}/{self.max_queue})")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        now = time.perf_counter()
+        for item in items:
+            future = loop.create_future()
+            self._queue.append((item, future, now))
+            futures.append(future)
+
+        if len(self._queue) >= self.max_batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_loop())
+
+        return await asyncio.gather(*futures)
+
+    async def submit(self, item):
+        return (await self.submit_many([item]))[0]
+
+    async def _flush_loop(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.executor.workers)
+
+        while self._queue:
+            # 1. 실행기 자리가 날 때까지 대기 (그동안 쌓인 요청은 다음 배치에 같이 탄다)
+            await self._slots.acquire()
+
+            # 2. 가장 오래 기다린 이미지 기준으로 배치 창이 닫힐 때까지 더 모으기
+            deadline = self._queue[0][2] + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._wakeup = asyncio.Event()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                finally:
+                    self._wakeup = None
+
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            self._record(batch)
+
+            # 3. 배치 실행은 따로 돌리고 바로 다음 배치를 모으러 감
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, task):
+        self._batch_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ 배치 실행 태스크 에러: {task.exception()!r}")
+
+    async def _run_batch(self, batch):
+        try:
+            results = await self.executor.run(self.batch_fn, [item for item, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            # batch_fn 이 결과를 덜 돌려주면 남은 요청이 영원히 기다리지 않게
+            for _, future, _ in batch[len(results):]:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"배치 결과 수가 모자람 ({len(results)}/{len(batch)})"))
+        finally:
+            self._slots.release()
+
+    def _record(self, batch):
+        started_at = time.perf_counter()
+        self._batches += 1
+        self._items += len(batch)
+        self._size_histogram[len(batch)] += 1
+        for _, _, enqueued_at in batch:
+            waited = started_at - enqueued_at
+            self._total_wait += waited
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+
+    def stats(self):
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "queued": len(self._queue),
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._size_histogram.items())),
+            "avg_wait_ms": round(self._total_wait / self._items * 1000, 3) if self._items else 0.0,
+            "max_wait_ms_seen": round(self._max_wait_seen * 1000, 3),
+        }
@@ -0,0 +1,125 @@
+# backend/app/services/embedding_cache.py
+
+import os
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+class EmbeddingCache:
+    """
+    이미지 바이트 해시 -> 512차원 벡터 캐시
+    - 1단계: 메모리 LRU (개수 제한)
+    - 2단계: 디스크 (선택, 서버 재시작해도 유지)
+    키에 모델 이름이 들어가서 모델을 바꾸면 자동으로 무효화됨
+    """
+    def __init__(self, model_name, max_items=1024, disk_dir=None):
+        self.model_name = model_name
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def make_key(self, image_source):
+        """
+        image_source: bytes 또는 파일 객체 (파일은 조금씩 읽어서 해시하고 처음으로 되돌림)
+        """
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        if isinstance(image_source, (bytes, bytearray)):
+            digest.update(image_source)
+        else:
+            image_source.seek(0)
+            for chunk in iter(lambda: image_source.read(1024 * 1024), b""):
+                digest.update(chunk)
+            image_source.seek(0)
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        # 한 폴더에 파일이 너무 몰리지 않게 앞 2글자로 나눔
+        return os.path.join(self.disk_dir, key[:2], f"{key}.f32")
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            vector = array("f")
+            with open(path, "rb") as f:
+                vector.frombytes(f.read())
+            return vector.tolist()
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 파일 읽기 실패 ({key}): {e}")
+            return None
+
+    def _write_disk(self, key, vector):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 다른 워커가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓰고 교체
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(array("f", vector).tobytes())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ 임베딩 캐시 파일 저장 실패 ({key}): {e}")
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+
+        if self.disk_dir:
+            vector = self._read_disk(key)
+            if vector is not None:
+                with self._lock:
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return vector
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, vector):
+        if vector is None:
+            return
+        with self._lock:
+            self._remember(key, vector)
+        if self.disk_dir:
+            self._write_disk(key, vector)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "size": len(self._memory),
+                "max_items": self.max_items,
+                "disk_dir": self.disk_dir,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,95 @@
+# backend/app/services/embedding_projection.py
+
+import os
+import threading
+import numpy as np
+from app.db.embedding_storage import EMBEDDING_PCA_DIM, CLIP_DIM
+
+# 카탈로그 임베딩으로 학습한 PCA 투영 행렬 (migrate_embedding_storage.py 가 생성)
+EMBEDDING_PCA_PATH = os.getenv("EMBEDDING_PCA_PATH", "models/embedding_pca.npz")
+
+def fit_projection(vectors, dim):
+    """
+    정규화한 임베딩들의 SVD 상위 dim개 축 -> 투영 행렬 [dim, 512]
+    평균을 빼지 않음 (CLIP 벡터는 공통 성분이 커서, 빼면 코사인 거리가 원래 값과 달라져
+    SIMILARITY_THRESHOLD 를 다시 맞춰야 함 -> 원점 기준 투영은 코사인 거리를 거의 그대로 유지)
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if len(matrix) < dim:
+        raise ValueError(f"PCA {dim}차원을 학습하려면 벡터가 {dim}개 이상 필요해 (현재 {len(matrix)}개)")
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    _, singular, vt = np.linalg.svd(matrix, full_matrices=False)
+    energy = singular ** 2
+    explained = float(energy[:dim].sum() / energy.sum())
+    return vt[:dim].astype(np.float32), explained
+
+class EmbeddingProjection:
+    """
+    CLIP 512차원 벡터 -> 저장 차원(EMBEDDING_PCA_DIM) 투영
+    무드 분류는 텍스트 임베딩과 같은 512차원 공간이 필요해서 투영 전 벡터로 함
+    """
+    def __init__(self, components, explained=None):
+        self.components = np.asarray(components, dtype=np.float32)   # [dim, 512]
+        self.explained = explained
+
+    @property
+    def dim(self):
+        return self.components.shape[0]
+
+    def project(self, vectors):
+        """
+        [N, 512] -> 정규화된 [N, dim] (float32)
+        """
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, CLIP_DIM)
+        reduced = matrix @ self.components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        return reduced / np.maximum(norms, 1e-12)
+
+    def save(self, path=EMBEDDING_PCA_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, components=self.components, explained=np.float32(self.explained or 0.0))
+
+    @classmethod
+    def load(cls, path=EMBEDDING_PCA_PATH):
+        data = np.load(path)
+        return cls(data["components"], float(data["explained"]))
+
+_projection = None
+_projection_lock = threading.Lock()
+
+def get_projection():
+    """
+    EMBEDDING_PCA_DIM 을 켰을 때만 투영 행렬을 한 번 읽어옴 (꺼져 있으면 None)
+    """
+    global _projection
+    if not EMBEDDING_PCA_DIM:
+        return None
+    if _projection is None:
+        with _projection_lock:
+            if _projection is None:
+                if not os.path.exists(EMBEDDING_PCA_PATH):
+                    raise RuntimeError(
+                        f"PCA 투영 파일이 없어: {EMBEDDING_PCA_PATH} (migrate_embedding_storage.py 먼저 실행)"
+                    )
+                projection = EmbeddingProjection.load(EMBEDDING_PCA_PATH)
+                if projection.dim != EMBEDDING_PCA_DIM:
+                    raise RuntimeError(
+                        f"PCA 투영 차원({projection.dim})과 EMBEDDING_PCA_DIM({EMBEDDING_PCA_DIM})이 달라"
+                    )
+                _projection = projection
+    return _projection
+
+def to_storage_vectors(vectors):
+    """
+    CLIP 벡터들 -> DB에 저장/검색하는 형식 (PCA 를 안 쓰면 그대로)
+    저장할 때와 검색 쿼리에 같은 투영을 써야 거리 비교가 맞음
+    """
+    projection = get_projection()
+    if projection is None:
+        return list(vectors)
+    return [row.tolist() for row in projection.project(vectors)]
+
+def to_storage_vector(vector):
+    if vector is None:
+        return None
+    return to_storage_vectors([vector])[0]
@@ -0,0 +1,60 @@
+# backend/app/services/image_decode.py
+
+import io
+import os
+import math
+from PIL import Image, ImageOps
+
+# 디코딩 설정
+# - IMAGE_DECODE_SIZE: 디코딩 직후 짧은 변 목표 크기 (CLIP 입력 224px의 2배 정도면 화질 손실 없음)
+# - IMAGE_MAX_PIXELS: 이보다 큰 이미지는 압축 폭탄으로 보고 거절 (기본 1억 화소)
+IMAGE_DECODE_SIZE = int(os.getenv("IMAGE_DECODE_SIZE", "448"))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "100000000"))
+
+class ImageRejected(ValueError):
+    """너무 크거나 읽을 수 없는 이미지"""
+    pass
+
+def decode_image(source, target_size=IMAGE_DECODE_SIZE, max_pixels=IMAGE_MAX_PIXELS):
+    """
+    업로드 이미지를 작은 크기로 바로 디코딩
+    source: bytes 또는 파일 객체 (UploadFile.file 스풀을 복사 없이 그대로 읽음)
+    1. 헤더만 읽어서 크기 확인 (압축 폭탄 거절)
+    2. JPEG은 draft 모드로 디코더 단계에서 1/2~1/8 축소
+    3. PNG 등은 정수배 reduce 로 빠르게 축소
+    4. EXIF 회전 정보 적용 후 RGB 변환
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif hasattr(source, "seek"):
+        source.seek(0)
+
+    try:
+        image = Image.open(source)
+    except Exception as e:
+        raise ImageRejected(f"이미지를 열 수 없습니다: {e}")
+
+    # 1. 실제 픽셀을 풀기 전에 크기 검사
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageRejected(f"이미지가 너무 큽니다 ({width}x{height})")
+
+    # 2. 짧은 변이 target_size 이상 남도록 축소 비율 계산
+    scale = target_size / min(width, height)
+    if scale < 1:
+        requested = (math.ceil(width * scale), math.ceil(height * scale))
+        if image.format == "JPEG":
+            image.draft("RGB", requested)
+        image.load()
+        factor = min(image.size[0] // requested[0], image.size[1] // requested[1])
+        if factor >= 2:
+            # reduce 는 팔레트(P) 등 일부 모드를 지원하지 않아서 먼저 RGB로
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image = image.reduce(factor)
+    else:
+        image.load()
+
+    # 3. 폰 사진의 회전 정보 반영 (세로 사진이 눕지 않게)
+    image = ImageOps.exif_transpose(image)
+    return image.convert("RGB")
@@ -0,0 +1,78 @@
+# backend/app/services/inference_backends.py
+
+import os
+import torch
+
+# export_backend.py 로 뽑은 (int8 동적 양자화) ONNX 비전 타워 경로
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "models/clip_vision_int8.onnx")
+
+class VisionEncoder(torch.nn.Module):
+    """
+    CLIP 비전 타워 + 투영층만 떼어낸 모듈 (pixel_values -> 512차원 벡터)
+    get_image_features와 같은 결과를 내고, compile/ONNX export 대상이 됨
+    """
+    def __init__(self, vision_model, visual_projection):
+        super().__init__()
+        self.vision_model = vision_model
+        self.visual_projection = visual_projection
+
+    @property
+    def dtype(self):
+        return self.visual_projection.weight.dtype
+
+    def forward(self, pixel_values):
+        vision_outputs = self.vision_model(pixel_values=pixel_values)
+        pooled_output = vision_outputs[1]
+        return self.visual_projection(pooled_output)
+
+class EagerBackend:
+    name = "eager"
+
+    def __init__(self, encoder):
+        self.encoder = encoder.eval()
+
+    def encode(self, pixel_values):
+        with torch.no_grad():
+            return self.encoder(pixel_values.to(self.encoder.dtype)).float()
+
+class CompiledBackend(EagerBackend):
+    name = "compile"
+
+    def __init__(self, encoder):
+        super().__init__(encoder)
+        # 배치 크기가 요청마다 달라서 dynamic=True 로 재컴파일을 줄임
+        self.compiled = torch.compile(self.encoder, dynamic=True)
+
+    def encode(self, pixel_values):
+        with torch.no_grad():
+            return self.compiled(pixel_values.to(self.encoder.dtype)).float()
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model_path=ONNX_MODEL_PATH):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("onnx 백엔드를 쓰려면 onnxruntime 설치가 필요합니다 (pip install onnxruntime)")
+
+        if not os.path.exists(model_path):
+            raise RuntimeError(f"ONNX 모델 파일이 없습니다: {model_path} (python export_backend.py 로 먼저 만들어주세요)")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def encode(self, pixel_values):
+        outputs = self.session.run(None, {self.input_name: pixel_values.numpy()})
+        return torch.from_numpy(outputs[0])
+
+def create_backend(name, encoder, onnx_model_path=ONNX_MODEL_PATH):
+    if name == "eager":
+        return EagerBackend(encoder)
+    if name == "compile":
+        return CompiledBackend(encoder)
+    if name == "onnx":
+        return OnnxBackend(onnx_model_path)
+    raise ValueError(f"지원하지 않는 추론 백엔드: {name} (eager / compile / onnx)")
@@ -0,0 +1,81 @@
+# backend/app/services/inference_executor.py
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# 추론 실행기 설정
+# - INFERENCE_EXECUTOR: thread(기본) / process (프로세스마다 모델을 따로 올림)
+# - INFERENCE_WORKERS: 동시에 CLIP을 돌릴 수 있는 작업 수
+# - INFERENCE_MAX_QUEUE: 실행 + 대기 중인 작업 최대 개수 (넘으면 바로 거절)
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "32"))
+
+class InferenceQueueFull(Exception):
+    """대기열이 가득 차서 추론 요청을 받을 수 없을 때"""
+    pass
+
+class InferenceExecutor:
+    """
+    CLIP 추론을 이벤트 루프 밖(스레드/프로세스 풀)에서 돌리는 실행기
+    추론 중에도 /routes, /my-map, 카카오 로그인 같은 다른 요청이 막히지 않게 함
+    """
+    def __init__(self, kind=INFERENCE_EXECUTOR, workers=INFERENCE_WORKERS, max_queue=INFERENCE_MAX_QUEUE,
+                 initializer=None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"지원하지 않는 실행기 종류: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(self.workers, max_queue)
+        # 워커(스레드/프로세스)가 처음 뜰 때 한 번씩 실행할 함수 (모델 로딩 + 워밍업, 풀을 만들기 전에 정해야 함)
+        self.initializer = initializer
+        self._pool = None
+        self._semaphore = None
+        self._pending = 0
+
+    def _get_pool(self):
+        # 풀은 처음 쓸 때 만든다 (프로세스 풀은 import 시점에 띄우면 안 됨)
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="clip-inference", initializer=self.initializer
+                )
+        return self._pool
+
+    async def run(self, func, *args):
+        """
+        func(*args)를 풀에서 실행하고 결과를 기다림
+        process 모드에서는 func가 모듈 최상위 함수여야 함 (pickle 가능)
+        """
+        if self._pending >= self.max_queue:
+            raise InferenceQueueFull(f"추론 대기열이 가득 찼습니다 ({self._pending}/{self.max_queue})")
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        self._pending += 1
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_pool(), func, *args)
+        finally:
+            self._pending -= 1
+
+    def stats(self):
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+# 서비스 인스턴스 생성
+inference_executor = InferenceExecutor()
@@ -0,0 +1,281 @@
+# backend/app/services/itinerary_scheduler.py
+
+import os
+import time
+import numpy as np
+
+from app.services.route_optimizer import build_leg_matrices, _with_end_node
+
+# 영업시간 / 머무는 시간을 고려한 하루 일정 짜기
+# - ITINERARY_TIME_BUDGET_MS: 구간 행렬 준비 + 일정 계산 전체에 쓰는 시간 (장소가 20곳 넘어도 이 안에서 끝냄)
+#   출발지 실시간 도로 탐색은 이 중 절반까지만 쓰고 (못 끝낸 구간은 직선 기준), 남은 시간으로 일정 탐색
+# - ITINERARY_DEFAULT_DWELL_MIN: 머무는 시간을 안 보냈을 때 기본값 (분)
+# - ITINERARY_DAY_END: 종료 시각을 안 보냈을 때 일정이 끝나야 하는 시각
+ITINERARY_TIME_BUDGET_MS = float(os.getenv("ITINERARY_TIME_BUDGET_MS", "100"))
+ITINERARY_DEFAULT_DWELL_MIN = int(os.getenv("ITINERARY_DEFAULT_DWELL_MIN", "60"))
+ITINERARY_DAY_END = os.getenv("ITINERARY_DAY_END", "24:00")
+
+# 시간 예산 중 실시간 구간 계산(도로 탐색)에 쓸 수 있는 최대 비율
+_LEG_BUDGET_SHARE = 0.5
+# 일정 탐색이 끝난 뒤 (남은 장소 붙이기 + 시각표 만들기) 드는 시간 (장소당 ms, 탐색 예산에서 미리 뺌)
+_FINISH_MS_PER_PLACE = 0.01
+# 시간 비교 여유 (분, 부동소수 오차)
+_EPS = 1e-6
+# 일정 비용 = 끝나는 시각 + 이 비율 x 총 이동 시간 (끝나는 시각이 같으면 덜 움직이는 쪽)
+_TRAVEL_WEIGHT = 0.1
+
+def parse_clock(value):
+    """
+    "09:30" -> 570 (자정부터 분)
+    """
+    try:
+        hours, minutes = value.strip().split(":")
+        hours, minutes = int(hours), int(minutes)
+    except (AttributeError, ValueError):
+        raise ValueError(f"시간 형식이 잘못됐어: {value} (예: 09:30)")
+    if not (0 <= hours <= 48 and 0 <= minutes < 60):
+        raise ValueError(f"시간 형식이 잘못됐어: {value} (예: 09:30)")
+    return hours * 60 + minutes
+
+def format_clock(minutes):
+    """
+    570.4 -> "09:30" (자정을 넘기면 다음 날 시각)
+    """
+    minutes = int(round(minutes)) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+class _Plan:
+    """
+    방문 순서 하나의 도착/시작 시각, 뒤로 밀 수 있는 여유 시간, 비용
+    route: [0(출발지), 장소들..., 끝 노드]
+    """
+    def __init__(self, problem, route):
+        self.route = route
+        travel, opens, latest, dwell = problem.travel, problem.opens, problem.latest, problem.dwell
+
+        size = len(route)
+        arrival = np.empty(size)
+        start = np.empty(size)
+        arrival[0] = start[0] = opens[0]
+        for k in range(1, size):
+            arrival[k] = start[k - 1] + dwell[route[k - 1]] + travel[route[k - 1], route[k]]
+            start[k] = max(opens[route[k]], arrival[k])
+        self.arrival = arrival
+        self.start = start
+        self.feasible = bool(np.all(start <= latest[route] + _EPS))
+
+        # max_shift[k]: k번째 방문 시작을 이만큼 늦춰도 뒤쪽 영업시간이 다 지켜짐
+        max_shift = np.empty(size)
+        max_shift[-1] = latest[route[-1]] - start[-1]
+        for k in range(size - 2, -1, -1):
+            max_shift[k] = min(latest[route[k]] - start[k], start[k + 1] - arrival[k + 1] + max_shift[k + 1])
+        self.max_shift = max_shift
+        # waits_after[k]: k 다음 방문들에서 기다리는 시간 합 (밀린 시간이 여기서 흡수됨)
+        waits = start - arrival
+        self.waits_after = np.concatenate([np.cumsum(waits[::-1])[::-1][1:], [0.0]])
+        self.cost = float(arrival[-1] + _TRAVEL_WEIGHT * travel[route[:-1], route[1:]].sum())
+
+    def insertions(self, problem, place):
+        """
+        place 를 각 자리(route[p] 와 route[p+1] 사이)에 끼웠을 때 (늘어나는 비용 [p], 가능 여부 [p])
+        기다리는 시간 사이에 끼우면 끝나는 시각은 그대로라 비용이 거의 안 늘어남
+        """
+        travel, opens, latest, dwell = problem.travel, problem.opens, problem.latest, problem.dwell
+        prev, nxt = self.route[:-1], self.route[1:]
+
+        start_place = np.maximum(opens[place], self.start[:-1] + dwell[prev] + travel[prev, place])
+        start_next = np.maximum(opens[nxt], start_place + dwell[place] + travel[place, nxt])
+        shift = start_next - self.start[1:]
+        feasible = (start_place <= latest[place] + _EPS) & (shift <= self.max_shift[1:] + _EPS)
+        end_shift = np.maximum(shift - self.waits_after[1:], 0.0)
+        delta = end_shift + _TRAVEL_WEIGHT * (travel[prev, place] + travel[place, nxt] - travel[prev, nxt])
+        return delta, feasible
+
+class _Problem:
+    """
+    시간 행렬 + 장소별 (여는 시각, 마지막으로 방문을 시작할 수 있는 시각, 머무는 시간)
+    노드 번호: 0 = 출발지, 1..n = 장소, n+1 = 끝 노드 (출발지 복귀면 출발지, 아니면 어디서 끝나도 0분)
+    """
+    def __init__(self, durations, opens, closes, dwell, start_min, end_min, return_to_start):
+        self.travel = _with_end_node(durations, return_to_start)
+        self.opens = np.concatenate([[start_min], opens, [start_min]])
+        self.dwell = np.concatenate([[0.0], dwell, [0.0]])
+        # 문 닫기 전에 다 보고 나와야 하고, 일정 종료 시각 전에 끝나야 함
+        finish = np.minimum(np.concatenate([[start_min], closes, [end_min]]), end_min)
+        self.latest = finish - self.dwell
+        self.end = len(self.travel) - 1
+
+def _best_insertion(problem, plan, candidates, deadline):
+    """
+    후보 장소들 중 비용이 가장 적게 늘어나는 (장소, 자리, 증가량) - 끼울 곳이 없거나 시간이 다 되면 None
+    """
+    best = None
+    for place in candidates:
+        if time.perf_counter() > deadline:
+            return None
+        delta, feasible = plan.insertions(problem, place)
+        if not feasible.any():
+            continue
+        delta = np.where(feasible, delta, np.inf)
+        position = int(delta.argmin())
+        if best is None or delta[position] < best[2] - _EPS:
+            best = (place, position, float(delta[position]))
+    return best
+
+def _insert(route, place, position):
+    return np.concatenate([route[:position + 1], [place], route[position + 1:]])
+
+def _fill(problem, plan, pending, deadline):
+    """
+    남은 장소들을 끼울 수 있는 동안 가장 싼 자리에 하나씩 끼움 (cheapest insertion)
+    """
+    while pending and time.perf_counter() < deadline:
+        best = _best_insertion(problem, plan, pending, deadline)
+        if best is None:
+            break
+        place, position, _ = best
+        plan = _Plan(problem, _insert(plan.route, place, position))
+        pending.remove(place)
+    return plan
+
+def _relocate(problem, plan, deadline):
+    """
+    방문 하나를 빼서 더 나은 자리에 다시 끼우기 (영업시간을 지키면서 비용이 줄어들 때만)
+    """
+    improved = False
+    k = 1
+    while k < len(plan.route) - 1:
+        if time.perf_counter() > deadline:
+            break
+        place = plan.route[k]
+        removed = _Plan(problem, np.delete(plan.route, k))
+        if removed.feasible:
+            delta, feasible = removed.insertions(problem, place)
+            delta = np.where(feasible, delta, np.inf)
+            position = int(delta.argmin())
+            if removed.cost + delta[position] < plan.cost - _EPS:
+                plan = _Plan(problem, _insert(removed.route, place, position))
+                improved = True
+                continue
+        k += 1
+    return plan, improved
+
+def solve_schedule(problem, time_budget_ms=ITINERARY_TIME_BUDGET_MS):
+    """
+    1) cheapest insertion 으로 영업시간을 지키는 일정 만들기 (증가량이 같으면 문 닫는 시각이 빠른 곳 먼저)
+    2) 남은 시간 동안 relocate 로 일정 줄이기 + 못 넣은 장소 다시 넣어보기
+    비용 = 일정이 끝나는 시각 (+ 이동 시간 조금) -> 문 열기를 기다리는 동안 다른 곳을 다녀오게 됨
+    시간 예산이 끝나면 그때까지 찾은 (항상 영업시간을 지키는) 일정을 돌려줌
+    return: (방문 순서(장소 번호 1..n), 못 넣은 장소 번호들)
+    """
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    n = problem.end - 1
+    pending = sorted(range(1, n + 1), key=lambda place: problem.latest[place])
+
+    plan = _fill(problem, _Plan(problem, np.asarray([0, problem.end], dtype=np.int64)), pending, deadline)
+    while time.perf_counter() < deadline:
+        plan, improved = _relocate(problem, plan, deadline)
+        if pending:
+            before = len(pending)
+            plan = _fill(problem, plan, pending, deadline)
+            improved = improved or len(pending) < before
+        if not improved:
+            break
+
+    # 시간 예산이 끝났는데 남은 장소: 마지막 방문 뒤에 붙일 수 있으면 붙이기만 (장소당 계산 몇 번)
+    return _append_tail(problem, plan, pending), pending
+
+def _append_tail(problem, plan, pending):
+    """
+    남은 장소들을 (문 닫는 시각 순서로) 마지막 방문 뒤에 붙일 수 있으면 붙임 - 스칼라 계산이라 시간 예산 밖이어도 짧음
+    """
+    travel, opens, latest, dwell, end = problem.travel, problem.opens, problem.latest, problem.dwell, problem.end
+    route = plan.route[:-1].tolist()
+    last = route[-1]
+    finish = plan.start[-2] + dwell[last]
+    for place in list(pending):
+        start_place = max(opens[place], finish + travel[last, place])
+        done = start_place + dwell[place]
+        if start_place <= latest[place] + _EPS and done + travel[place, end] <= latest[end] + _EPS:
+            route.append(place)
+            pending.remove(place)
+            last, finish = place, done
+    if len(route) == len(plan.route) - 1:
+        return plan
+    return _Plan(problem, np.asarray(route + [end], dtype=np.int64))
+
+def schedule_itinerary(start_lat, start_lng, places, start_time, end_time=None, return_to_start=False,
+                       time_budget_ms=ITINERARY_TIME_BUDGET_MS):
+    """
+    영업시간(open_time / close_time)과 머무는 시간(dwell_min)을 지키는 방문 순서 + 시각표
+    places: [{id, name, lat, lng, open_time?, close_time?, dwell_min?}, ...]
+    영업시간 안에 못 넣는 장소는 일정에서 빼고 summary["unscheduled"] 로 돌려줌
+    time_budget_ms 는 이 함수 전체 기준 (도로 탐색은 절반까지, 구간 행렬 준비에 쓴 시간을 빼고 남은 만큼 일정 탐색)
+    return: (일정 순서 장소 목록, 요약)
+    """
+    started = time.perf_counter()
+    start_min = parse_clock(start_time)
+    end_min = parse_clock(end_time or ITINERARY_DAY_END)
+    if end_min <= start_min:
+        end_min += 24 * 60
+
+    opens, closes, dwell = [], [], []
+    for place in places:
+        open_min = parse_clock(place["open_time"]) if place.get("open_time") else 0
+        close_min = parse_clock(place["close_time"]) if place.get("close_time") else 48 * 60
+        if close_min <= open_min:
+            close_min += 24 * 60           # 새벽까지 여는 곳 (예: 18:00 ~ 02:00)
+        stay = place.get("dwell_min")
+        stay = ITINERARY_DEFAULT_DWELL_MIN if stay is None else stay
+        if stay < 0:
+            raise ValueError(f"머무는 시간은 0분 이상이어야 해: {place.get('name')}")
+        opens.append(open_min)
+        closes.append(close_min)
+        dwell.append(stay)
+
+    leg_deadline = started + time_budget_ms * _LEG_BUDGET_SHARE / 1000
+    distances, durations, walks = build_leg_matrices(start_lat, start_lng, places, deadline=leg_deadline)
+    problem = _Problem(durations, np.asarray(opens, dtype=np.float64), np.asarray(closes, dtype=np.float64),
+                       np.asarray(dwell, dtype=np.float64), start_min, end_min, return_to_start)
+    remaining_ms = time_budget_ms - (time.perf_counter() - started) * 1000 - len(places) * _FINISH_MS_PER_PLACE
+    plan, pending = solve_schedule(problem, max(remaining_ms, 0.0))
+
+    scheduled = []
+    total_km = 0.0
+    total_min = 0
+    wait_min = 0
+    for k in range(1, len(plan.route) - 1):
+        node = plan.route[k]
+        previous = plan.route[k - 1]
+        place = places[node - 1]
+        wait = plan.start[k] - plan.arrival[k]
+        place["duration"] = int(round(durations[previous, node]))               # 이전 지점에서 오는 시간 (분)
+        place["transport"] = "도보" if walks[previous, node] else "차량"
+        place["arrival"] = format_clock(plan.arrival[k])                        # 예: "10:40"
+        place["visit_start"] = format_clock(plan.start[k])                      # 예: "11:00" (문 열 때까지 기다림)
+        place["departure"] = format_clock(plan.start[k] + problem.dwell[node])  # 예: "12:00"
+        place["wait"] = int(round(wait))
+        place["dwell"] = int(round(problem.dwell[node]))
+        scheduled.append(place)
+        total_km += distances[previous, node]
+        total_min += place["duration"]
+        wait_min += place["wait"]
+
+    last = plan.route[-2]
+    return_min = None
+    if return_to_start:
+        total_km += distances[last, 0]
+        return_min = int(round(durations[last, 0]))
+        total_min += return_min
+
+    summary = {
+        "total_km": round(float(total_km), 3),
+        "total_min": total_min,
+        "return_min": return_min,
+        "solver": "itinerary",
+        "start_time": format_clock(start_min),
+        "end_time": format_clock(plan.arrival[-1]),                             # 마지막 장소를 나온 (복귀면 도착한) 시각
+        "wait_min": wait_min,
+        "unscheduled": [places[node - 1] for node in sorted(pending)],
+    }
+    return scheduled, summary
@@ -0,0 +1,42 @@
+# backend/app/services/place_embeddings.py
+
+import numpy as np
+from collections import Counter
+from app.db.embedding_storage import CLIP_DIM
+from app.services.embedding_projection import to_storage_vector
+
+def compute_centroid(vectors):
+    """
+    사진 임베딩들의 centroid (각각 정규화 -> 평균 -> 다시 정규화)
+    사진마다 벡터 크기가 달라도 한 장이 평균을 끌고 가지 않게 함
+    """
+    matrix = np.asarray([v for v in vectors if v is not None], dtype=np.float32)
+    if len(matrix) == 0:
+        return None
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    centroid = matrix.mean(axis=0)
+    return (centroid / np.linalg.norm(centroid)).tolist()
+
+def refresh_place_embedding(place, classify_mood, vectors=None):
+    """
+    place.images 로 장소 centroid 임베딩과 무드를 다시 계산
+    classify_mood: 벡터 -> 무드 함수 (recommend_service.analyze_mood)
+    vectors: 사진들의 CLIP 원본 벡터 (시딩 때처럼 있으면 512차원에서 centroid/무드 계산 후 저장 형식으로 투영)
+    """
+    if vectors is not None:
+        centroid = compute_centroid(vectors)
+        place.mood = classify_mood(centroid) if centroid is not None else None
+        place.embedding = to_storage_vector(centroid)
+        return place
+
+    centroid = compute_centroid([image.embedding for image in place.images])
+    place.embedding = centroid
+    if centroid is None:
+        place.mood = None
+    elif len(centroid) == CLIP_DIM:
+        place.mood = classify_mood(centroid)
+    else:
+        # PCA 로 줄여서 저장된 벡터는 텍스트 임베딩과 비교할 수 없어서 사진 무드 다수결
+        moods = Counter(image.mood for image in place.images if image.mood)
+        place.mood = moods.most_common(1)[0][0] if moods else None
+    return place
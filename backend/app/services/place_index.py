@@ -0,0 +1,186 @@
+# backend/app/services/place_index.py
+
+import os
+import time
+import threading
+import numpy as np
+from sqlalchemy import select, func, cast, Text
+
+from app.db.models import Place
+from app.db.embedding_storage import EMBEDDING_DIM
+
+# 메모리 장소 인덱스 설정
+# - PLACE_INDEX_ENABLED: 1이면 유사도 검색을 DB 대신 프로세스 메모리 행렬곱으로 처리
+# - PLACE_INDEX_REFRESH_SECONDS: 이 주기마다 DB와 비교해서 바뀐 장소만 반영
+PLACE_INDEX_ENABLED = os.getenv("PLACE_INDEX_ENABLED", "0") == "1"
+PLACE_INDEX_REFRESH_SECONDS = float(os.getenv("PLACE_INDEX_REFRESH_SECONDS", "300"))
+
+def place_content_hash():
+    """
+    장소 행 내용 해시 (DB에서 계산) - 임베딩 / 무드 / 이름 등 인덱스에 들고 있는 값이 하나라도 바뀌면 달라짐
+    """
+    return func.md5(func.concat_ws(
+        "|", cast(Place.embedding, Text), Place.mood, Place.name, Place.description, Place.address,
+        Place.image_path, cast(Place.latitude, Text), cast(Place.longitude, Text),
+    ))
+
+class PlaceRecord:
+    """
+    인덱스에 들고 있는 장소 정보 (Place 행과 같은 속성 이름, DB 세션과 무관)
+    """
+    __slots__ = ("id", "name", "description", "address", "image_path", "latitude", "longitude", "mood")
+
+    def __init__(self, place):
+        for attr in self.__slots__:
+            setattr(self, attr, getattr(place, attr))
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class PlaceIndex:
+    """
+    장소 임베딩 전체를 정규화된 float32 행렬 하나로 들고 있는 인메모리 인덱스
+    여러 개의 쿼리 벡터 top-k를 행렬곱 한 번 + argpartition 으로 계산
+    """
+    def __init__(self, dim=EMBEDDING_DIM, refresh_seconds=PLACE_INDEX_REFRESH_SECONDS):
+        self.dim = dim
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refreshed_at = 0.0
+        # (ids, matrix, moods, records) 를 한 번에 바꿔 끼워서 검색 중에도 일관된 스냅샷을 봄
+        self._state = (
+            np.empty(0, dtype=np.int64),
+            np.empty((0, dim), dtype=np.float32),
+            np.empty(0, dtype=object),
+            [],
+        )
+        self._hashes = {}       # 장소 id -> 마지막으로 반영한 행 내용 해시
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def upsert(self, places, hashes=None):
+        """
+        장소 추가/수정 (같은 id가 있으면 교체)
+        hashes: {장소 id: 행 내용 해시} (없으면 다음 refresh 때 DB 값으로 한 번 더 확인)
+        """
+        places = [p for p in places if p.embedding is not None]
+        if not places:
+            return
+        with self._lock:
+            for place in places:
+                if hashes and place.id in hashes:
+                    self._hashes[place.id] = hashes[place.id]
+                else:
+                    self._hashes.pop(place.id, None)
+            ids, matrix, moods, records = self._state
+            position = {place_id: i for i, place_id in enumerate(ids.tolist())}
+
+            new_vectors = _normalize(np.asarray([p.embedding for p in places], dtype=np.float32))
+            matrix = matrix.copy()
+            moods = moods.copy()
+            records = list(records)
+            base = len(ids)
+            appended_ids, appended_rows, appended_moods = [], [], []
+
+            for place, vector in zip(places, new_vectors):
+                i = position.get(place.id)
+                if i is None:
+                    # 새 장소는 모아뒀다가 마지막에 한 번에 붙임 (같은 호출에서 또 나오면 그 자리를 교체)
+                    position[place.id] = base + len(appended_ids)
+                    appended_ids.append(place.id)
+                    appended_rows.append(vector)
+                    appended_moods.append(place.mood)
+                    records.append(PlaceRecord(place))
+                elif i >= base:
+                    appended_rows[i - base] = vector
+                    appended_moods[i - base] = place.mood
+                    records[i] = PlaceRecord(place)
+                else:
+                    matrix[i] = vector
+                    moods[i] = place.mood
+                    records[i] = PlaceRecord(place)
+
+            if appended_ids:
+                ids = np.concatenate([ids, np.asarray(appended_ids, dtype=np.int64)])
+                matrix = np.ascontiguousarray(np.vstack([matrix, np.asarray(appended_rows, dtype=np.float32)]))
+                new_moods = np.empty(len(appended_moods), dtype=object)
+                new_moods[:] = appended_moods
+                moods = np.concatenate([moods, new_moods])
+            self._state = (ids, matrix, moods, records)
+
+    def remove(self, place_ids):
+        with self._lock:
+            for place_id in place_ids:
+                self._hashes.pop(place_id, None)
+            ids, matrix, moods, records = self._state
+            keep = ~np.isin(ids, np.asarray(list(place_ids), dtype=np.int64))
+            self._state = (
+                ids[keep],
+                np.ascontiguousarray(matrix[keep]),
+                moods[keep],
+                [r for r, k in zip(records, keep.tolist()) if k],
+            )
+
+    def refresh(self, db):
+        """
+        DB와 (id, 행 내용 해시)를 비교해서 추가/삭제/내용이 바뀐 장소만 반영
+        (다시 시딩된 장소, centroid 재계산, 무드 변경 모두 해시가 달라져서 잡힘)
+        """
+        current = dict(db.execute(select(Place.id, place_content_hash()).where(Place.embedding.isnot(None))).all())
+        ids = self._state[0]
+        known = self._hashes
+
+        removed = set(ids.tolist()) - current.keys()
+        changed = [place_id for place_id, digest in current.items() if known.get(place_id) != digest]
+
+        if removed:
+            self.remove(removed)
+        if changed:
+            self.upsert(db.scalars(select(Place).where(Place.id.in_(changed))).all(), hashes=current)
+        self._refreshed_at = time.monotonic()
+
+        if removed or changed:
+            print(f"🗂️ 장소 인덱스 갱신: +{len(changed)} -{len(removed)} (총 {len(self)}개)")
+
+    def refresh_if_stale(self, db):
+        if time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+            self.refresh(db)
+
+    def search(self, query_vectors, k=10, moods=None):
+        """
+        query_vectors: [Q, EMBEDDING_DIM] 쿼리 벡터들 (저장 형식으로 투영된)
+        moods: 쿼리별 무드 (주면 같은 무드의 장소만)
+        return: 쿼리마다 [(PlaceRecord, 코사인 거리), ...] 가까운 순
+        """
+        ids, matrix, place_moods, records = self._state
+        if len(ids) == 0 or len(query_vectors) == 0:
+            return [[] for _ in query_vectors]
+
+        queries = _normalize(np.asarray(query_vectors, dtype=np.float32))
+        similarity = queries @ matrix.T  # [Q, N]
+
+        if moods is not None:
+            mismatch = place_moods[None, :] != np.asarray(moods, dtype=object)[:, None]
+            similarity[mismatch] = -np.inf
+
+        k = min(k, len(ids))
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = []
+        for row_indices, row_scores in zip(top.tolist(), top_scores.tolist()):
+            results.append([
+                (records[i], 1.0 - score)
+                for i, score in zip(row_indices, row_scores)
+                if score != -np.inf
+            ])
+        return results
+
+# 서비스 인스턴스 생성
+place_index = PlaceIndex()
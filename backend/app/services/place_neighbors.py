@@ -0,0 +1,148 @@
+# backend/app/services/place_neighbors.py
+
+import os
+import hashlib
+import numpy as np
+from sqlalchemy import select, delete
+
+from app.db.models import Place, PlaceNeighbor
+
+# 장소마다 저장해 둘 비슷한 장소 수
+PLACE_NEIGHBORS_K = int(os.getenv("PLACE_NEIGHBORS_K", "20"))
+# 한 번에 거리 행렬을 계산할 장소 수 (메모리: CHUNK x 전체 장소 수)
+_CHUNK_SIZE = 1024
+
+def embedding_hash(vector, mood=None):
+    """
+    임베딩 + 무드 해시 (무드만 바뀌어도 이 장소가 들어 있는 목록의 mood 가 갱신되게)
+    """
+    digest = hashlib.sha1(np.asarray(vector, dtype=np.float32).tobytes())
+    digest.update((mood or "").encode())
+    return digest.hexdigest()[:16]
+
+def compute_neighbors(matrix, positions, k):
+    """
+    matrix: 정규화된 [N, D] 장소 임베딩
+    positions: 이웃을 구할 장소들의 행 번호
+    return: 장소마다 [(이웃 행 번호, 코사인 거리), ...] 가까운 순 (자기 자신 제외)
+    """
+    k = min(k, len(matrix) - 1)
+    results = []
+    if k <= 0:
+        return [[] for _ in positions]
+    for start in range(0, len(positions), _CHUNK_SIZE):
+        chunk = np.asarray(positions[start:start + _CHUNK_SIZE], dtype=np.int64)
+        distances = 1.0 - matrix[chunk] @ matrix.T
+        distances[np.arange(len(chunk)), chunk] = np.inf
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        for row, candidates in enumerate(top):
+            order = candidates[np.argsort(distances[row, candidates])]
+            results.append([(int(j), float(distances[row, j])) for j in order])
+    return results
+
+def _load_catalog(db):
+    rows = db.execute(select(Place.id, Place.embedding, Place.mood).where(Place.embedding.isnot(None))).all()
+    ids = [r[0] for r in rows]
+    vectors = np.asarray([r[1] for r in rows], dtype=np.float32)
+    if len(vectors):
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return ids, vectors, [r[2] for r in rows], [embedding_hash(r[1], r[2]) for r in rows]
+
+def _load_stored(db):
+    """
+    {장소 id: (source_hash, [(이웃 id, 거리, 순위), ...])}
+    """
+    stored = {}
+    for row in db.scalars(select(PlaceNeighbor).order_by(PlaceNeighbor.place_id, PlaceNeighbor.rank)).all():
+        entry = stored.setdefault(row.place_id, (row.source_hash, []))
+        entry[1].append((row.neighbor_id, row.distance, row.rank))
+    return stored
+
+def pick_targets(ids, matrix, hashes, stored, k):
+    """
+    다시 계산해야 하는 장소 id 들 + 목록을 지워야 하는 (없어진) 장소 id 들
+    1. 새로 생겼거나 임베딩/무드가 바뀐 장소 (source_hash 비교)
+    2. 목록에 바뀐/없어진 장소가 들어 있던 장소
+    3. 목록 길이가 min(k, 장소 수 - 1) 과 다르거나 순위에 빈칸이 있는 장소
+       (장소를 지울 때 FK 때문에 그 장소를 가리키는 행이 먼저 지워지면 2번으로는 못 찾음)
+    4. 바뀐 장소가 기존 k번째 이웃보다 가까워진 장소
+    """
+    positions = {place_id: i for i, place_id in enumerate(ids)}
+    removed = set(stored) - set(positions)
+    changed = {place_id for place_id, h in zip(ids, hashes) if stored.get(place_id, (None,))[0] != h}
+    stale = changed | removed
+    full_length = min(k, len(ids) - 1)
+
+    targets = set(changed)
+    for place_id, (_, neighbors) in stored.items():
+        if place_id not in positions:
+            continue
+        ranks = [rank for _, _, rank in neighbors]
+        if (len(neighbors) != full_length or ranks != list(range(1, len(neighbors) + 1))
+                or any(neighbor_id in stale or neighbor_id not in positions for neighbor_id, _, _ in neighbors)):
+            targets.add(place_id)
+
+    if changed and full_length > 0:
+        kth = np.full(len(ids), np.inf, dtype=np.float32)
+        for place_id, (_, neighbors) in stored.items():
+            if place_id in positions and len(neighbors) >= full_length:
+                kth[positions[place_id]] = neighbors[full_length - 1][1]
+        changed_rows = np.asarray([positions[place_id] for place_id in changed], dtype=np.int64)
+        closer = ((1.0 - matrix[changed_rows] @ matrix.T) < kth[None, :]).any(axis=0)
+        targets.update(ids[i] for i in np.flatnonzero(closer))
+    return targets, removed
+
+def update_place_neighbors(db, k=PLACE_NEIGHBORS_K, full=False):
+    """
+    place_neighbors 테이블 갱신 (커밋은 호출한 쪽에서)
+    full=False 면 pick_targets 로 고른 장소만 다시 계산 (결과는 full=True 와 같아야 함 -> verify_place_neighbors)
+    return: 다시 계산한 장소 수
+    """
+    ids, matrix, moods, hashes = _load_catalog(db)
+    positions = {place_id: i for i, place_id in enumerate(ids)}
+    if full:
+        targets, removed = set(ids), set()
+    else:
+        targets, removed = pick_targets(ids, matrix, hashes, _load_stored(db), k)
+
+    # 다시 계산할 장소 + 삭제된 장소의 기존 행 지우고 새로 넣기
+    obsolete = list(targets | removed)
+    if full:
+        db.execute(delete(PlaceNeighbor))
+    elif obsolete:
+        db.execute(delete(PlaceNeighbor).where(PlaceNeighbor.place_id.in_(obsolete)))
+
+    target_ids = sorted(targets)
+    target_rows = [positions[place_id] for place_id in target_ids]
+    for place_id, neighbors in zip(target_ids, compute_neighbors(matrix, target_rows, k)):
+        source_hash = hashes[positions[place_id]]
+        db.add_all([
+            PlaceNeighbor(
+                place_id=place_id,
+                neighbor_id=ids[j],
+                rank=rank,
+                distance=distance,
+                mood=moods[j],
+                source_hash=source_hash,
+            )
+            for rank, (j, distance) in enumerate(neighbors, start=1)
+        ])
+    db.flush()
+    return len(target_ids)
+
+def verify_place_neighbors(db, k=PLACE_NEIGHBORS_K):
+    """
+    저장된 목록이 처음부터 다시 계산한 결과와 같은지 확인
+    return: 목록이 다른 장소 id 들
+    """
+    ids, matrix, _, _ = _load_catalog(db)
+    stored = _load_stored(db)
+    expected = {
+        place_id: [ids[j] for j, _ in neighbors]
+        for place_id, neighbors in zip(ids, compute_neighbors(matrix, list(range(len(ids))), k))
+    }
+    actual = {place_id: [neighbor_id for neighbor_id, _, _ in neighbors] for place_id, (_, neighbors) in stored.items()}
+    return sorted(
+        place_id for place_id in set(expected) | set(actual)
+        if expected.get(place_id, []) != actual.get(place_id, [])
+    )
@@ -0,0 +1,208 @@
+# backend/app/services/pq_index.py
+
+import os
+import threading
+import numpy as np
+
+# 압축(IVF-PQ) 장소 인덱스 설정
+# - PQ_INDEX_PATH: build_pq_index.py 로 만든 .npz 파일 (비워두면 사용 안 함)
+# - PQ_NPROBE: 쿼리마다 뒤져볼 coarse 클러스터 수
+# - PQ_RERANK: 압축 점수로 고른 뒤 원본 벡터로 다시 정렬할 후보 수
+PQ_INDEX_PATH = os.getenv("PQ_INDEX_PATH", "")
+PQ_NPROBE = int(os.getenv("PQ_NPROBE", "8"))
+PQ_RERANK = int(os.getenv("PQ_RERANK", "100"))
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def _nearest(x, centroids, chunk=65536):
+    # L2 최근접 센트로이드 (||c||^2 - 2x·c 최소), 메모리 아끼려고 나눠서 계산
+    c_norms = (centroids ** 2).sum(axis=1)
+    assign = np.empty(len(x), dtype=np.int64)
+    for start in range(0, len(x), chunk):
+        block = x[start:start + chunk]
+        assign[start:start + chunk] = np.argmin(c_norms[None, :] - 2 * block @ centroids.T, axis=1)
+    return assign
+
+def _kmeans(x, k, iters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    k = min(k, len(x))
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(iters):
+        assign = _nearest(x, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        counts = np.bincount(assign, minlength=k)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        # 빈 클러스터는 아무 점으로 다시 시작
+        if empty.any():
+            centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+    return centroids
+
+class IVFPQIndex:
+    """
+    IVF(coarse 클러스터) + PQ(잔차를 M개 부분공간 x 256 코드북으로 압축) + 선택적 OPQ 회전
+    벡터 하나를 512*4 바이트 대신 M 바이트(예: 64)로 저장
+    내적 기반이라 쿼리별 룩업 테이블 하나로 모든 리스트의 점수를 계산 (ADC)
+    """
+    def __init__(self, nlist=256, m=64, nbits=8, opq=True):
+        self.nlist = nlist
+        self.m = m
+        self.ksub = 2 ** nbits
+        self.opq = opq
+        self.coarse = None        # [nlist, D]
+        self.rotation = None      # [D, D] (OPQ, 없으면 단위행렬)
+        self.codebooks = None     # [M, ksub, D/M]
+        self.ids = None           # [N] 리스트 순서로 정렬된 장소 id
+        self.codes = None         # [N, M] uint8
+        self.list_of = None       # [N] 각 항목의 coarse 리스트
+        self.list_offsets = None  # [nlist + 1]
+        self.moods = None         # [N] 무드 번호
+        self.mood_vocab = []
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    def _train_pq(self, residuals, iters):
+        dsub = residuals.shape[1] // self.m
+        return np.stack([
+            _kmeans(residuals[:, i * dsub:(i + 1) * dsub], self.ksub, iters=iters, seed=i)
+            for i in range(self.m)
+        ])
+
+    def _encode(self, residuals):
+        dsub = residuals.shape[1] // self.m
+        codes = np.empty((len(residuals), self.m), dtype=np.uint8)
+        for i in range(self.m):
+            codes[:, i] = _nearest(residuals[:, i * dsub:(i + 1) * dsub], self.codebooks[i])
+        return codes
+
+    def _decode(self, codes):
+        return np.concatenate([self.codebooks[i][codes[:, i]] for i in range(self.m)], axis=1)
+
+    def train(self, vectors, max_train=100_000, opq_iters=4, seed=0):
+        x = _normalize(np.asarray(vectors, dtype=np.float32))
+        if x.shape[1] % self.m:
+            raise ValueError(f"차원({x.shape[1]})이 PQ 부분공간 수({self.m})로 나눠떨어져야 합니다")
+        rng = np.random.default_rng(seed)
+        if len(x) > max_train:
+            x = x[rng.choice(len(x), max_train, replace=False)]
+
+        # 1. coarse 양자화기 + 잔차
+        self.coarse = _kmeans(x, self.nlist, seed=seed)
+        self.nlist = len(self.coarse)
+        residuals = x - self.coarse[_nearest(x, self.coarse)]
+
+        # 2. OPQ: 회전 R 과 PQ 코드북을 번갈아 학습 (Procrustes)
+        self.rotation = np.eye(x.shape[1], dtype=np.float32)
+        if self.opq:
+            for _ in range(opq_iters):
+                rotated = residuals @ self.rotation
+                self.codebooks = self._train_pq(rotated, iters=8)
+                reconstructed = self._decode(self._encode(rotated))
+                u, _, vt = np.linalg.svd(residuals.T @ reconstructed)
+                self.rotation = (u @ vt).astype(np.float32)
+
+        # 3. 최종 PQ 코드북
+        self.codebooks = self._train_pq(residuals @ self.rotation, iters=20)
+
+    def add(self, ids, vectors, moods):
+        x = _normalize(np.asarray(vectors, dtype=np.float32))
+        lists = _nearest(x, self.coarse)
+        codes = self._encode((x - self.coarse[lists]) @ self.rotation)
+
+        # 처음 보는 무드는 뒤에 붙이기만 (정렬하면 이미 저장된 행들의 무드 번호가 어긋남)
+        lookup = {mood: number for number, mood in enumerate(self.mood_vocab)}
+        for mood in moods:
+            if mood is not None and mood not in lookup:
+                lookup[mood] = len(self.mood_vocab)
+                self.mood_vocab.append(mood)
+        mood_ids = np.asarray([lookup[m] if m is not None else -1 for m in moods], dtype=np.int16)
+
+        all_ids = np.asarray(ids, dtype=np.int64)
+        if self.ids is not None:
+            all_ids = np.concatenate([self.ids, all_ids])
+            lists = np.concatenate([self.list_of, lists])
+            codes = np.concatenate([self.codes, codes])
+            mood_ids = np.concatenate([self.moods, mood_ids])
+
+        # 리스트 번호 순서로 정렬해서 리스트마다 연속된 구간이 되도록
+        order = np.argsort(lists, kind="stable")
+        self.ids, self.list_of, self.codes, self.moods = all_ids[order], lists[order], codes[order], mood_ids[order]
+        self.list_offsets = np.searchsorted(self.list_of, np.arange(self.nlist + 1))
+
+    def search(self, query_vectors, k=10, moods=None, nprobe=PQ_NPROBE):
+        """
+        압축 점수 기준 상위 k개 후보 id (원본 벡터 재정렬은 호출하는 쪽에서)
+        return: 쿼리마다 [(장소 id, 근사 코사인 거리), ...]
+        """
+        if not len(self) or len(query_vectors) == 0:
+            return [[] for _ in query_vectors]
+
+        q = _normalize(np.asarray(query_vectors, dtype=np.float32))
+        coarse_scores = q @ self.coarse.T                                   # [Q, nlist]
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(-coarse_scores, nprobe - 1, axis=1)[:, :nprobe]
+
+        dsub = q.shape[1] // self.m
+        q_sub = (q @ self.rotation).reshape(len(q), self.m, dsub)
+        lut = np.einsum("qmd,mkd->qmk", q_sub, self.codebooks)             # [Q, M, ksub]
+
+        results = []
+        for qi in range(len(q)):
+            rows = np.concatenate([
+                np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in probes[qi]
+            ])
+            if moods is not None and moods[qi] in self.mood_vocab:
+                rows = rows[self.moods[rows] == self.mood_vocab.index(moods[qi])]
+            elif moods is not None:
+                rows = rows[:0]
+            if len(rows) == 0:
+                results.append([])
+                continue
+
+            scores = coarse_scores[qi, self.list_of[rows]] + lut[qi, np.arange(self.m), self.codes[rows]].sum(axis=1)
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            results.append([(int(self.ids[rows[i]]), float(1.0 - scores[i])) for i in best])
+        return results
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path, nlist=self.nlist, m=self.m, ksub=self.ksub, opq=self.opq,
+            coarse=self.coarse, rotation=self.rotation, codebooks=self.codebooks,
+            ids=self.ids, codes=self.codes, list_of=self.list_of, list_offsets=self.list_offsets,
+            moods=self.moods, mood_vocab=np.asarray(self.mood_vocab, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        index = cls(nlist=int(data["nlist"]), m=int(data["m"]), opq=bool(data["opq"]))
+        index.ksub = int(data["ksub"])
+        for name in ("coarse", "rotation", "codebooks", "ids", "codes", "list_of", "list_offsets", "moods"):
+            setattr(index, name, data[name])
+        index.mood_vocab = data["mood_vocab"].tolist()
+        return index
+
+_pq_index = None
+_pq_index_lock = threading.Lock()
+
+def get_pq_index():
+    """
+    PQ_INDEX_PATH 가 있으면 처음 쓸 때 한 번 로딩 (없으면 None)
+    """
+    global _pq_index
+    if not PQ_INDEX_PATH or not os.path.exists(PQ_INDEX_PATH):
+        return None
+    if _pq_index is None:
+        with _pq_index_lock:
+            if _pq_index is None:
+                _pq_index = IVFPQIndex.load(PQ_INDEX_PATH)
+                print(f"🗜️ 압축 장소 인덱스 로딩 완료: {len(_pq_index)}개 ({PQ_INDEX_PATH})")
+    return _pq_index
@@ -1,62 +1,321 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, values, column, cast, literal, func, true, Integer, String
 from fastapi import UploadFile
 from typing import List
-import torch 
+import os
+import time
+import threading
+import numpy as np
 
-from app.db.models import Place
-from app.services.ai_service import ai_instance
-from app.utils import calculate_distance, sort_by_shortest_path
+from app.db.models import Place, PlaceImage
+from app.db.vector_index import apply_search_settings
+from app.db.embedding_storage import embedding_type
+from app.services.ai_service import get_ai_service
+from app.services.batch_scheduler import BatchScheduler
+from app.services.place_index import place_index, PLACE_INDEX_ENABLED
+from app.services.recommendation_cache import recommendation_cache
+from app.services.pq_index import get_pq_index, PQ_RERANK
+from app.services.embedding_projection import to_storage_vectors
+from app.geo import haversine_one_to_many
+from app.services.route_optimizer import optimize_route
+
+# 업로드 사진과 장소의 코사인 거리 기준 (이보다 가까워야 추천)
+SIMILARITY_THRESHOLD = 0.45
+
+# 장소 검색 방식
+# - centroid: 장소별 평균 임베딩(places.embedding) 하나로 검색 (인덱스 벡터 수 = 장소 수)
+# - maxsim: 사진별 임베딩(place_images)으로 검색하고 장소마다 가장 가까운 사진 거리 사용
+PLACE_SEARCH_STRATEGY = os.getenv("PLACE_SEARCH_STRATEGY", "centroid")
+# maxsim 에서 사진별 ANN 후보를 limit x 이 배수만큼 가져온 뒤 장소별로 합쳐서 limit 개 (장소당 사진 수 정도)
+MAXSIM_OVERFETCH = int(os.getenv("MAXSIM_OVERFETCH", "4"))
+
+# 위치 하이브리드 점수 (점수 = 코사인 거리 + GEO_WEIGHT * 거리km / GEO_SCALE_KM)
+# - GEO_SCORING: 1이면 켜기
+# - GEO_RADIUS_KM: 0보다 크면 이 반경 밖 장소는 DB에서 아예 제외 (공간 인덱스로 거른 뒤 점수 정렬)
+GEO_SCORING_ENABLED = os.getenv("GEO_SCORING", "0") == "1"
+GEO_WEIGHT = float(os.getenv("GEO_WEIGHT", "0.05"))
+GEO_SCALE_KM = float(os.getenv("GEO_SCALE_KM", "10"))
+GEO_RADIUS_KM = float(os.getenv("GEO_RADIUS_KM", "0"))
+# 반경 없이 켰을 때: ANN 인덱스로 코사인 거리 후보 limit x 이 배수를 먼저 뽑고 그 안에서만 위치 점수로 재정렬
+# (점수식으로 바로 정렬하면 어떤 인덱스도 못 타서 매번 전체 스캔)
+GEO_RERANK = int(os.getenv("GEO_RERANK", "5"))
+
+# 비교할 무드 카테고리 정의 (영어 프롬프트 -> 한국어 결과 매핑)
+MOOD_LABEL_MAP = {
+    "A peaceful photo of nature, forest, and healing scenery": "자연/힐링",
+    "A retro style cafe with vintage atmosphere and emotional vibe": "레트로/감성카페",
+    "A busy city street at night with neon lights and urban view": "야경/도시",
+    "A dynamic photo of outdoor activities, sports, and excitement": "활동적/액티비티",
+    "A delicious photo of fresh bread, pastries, and a bakery": "맛집/빵지순례"
+}
+
+# 비전 전용 모드에서 쓰는 무드 텍스트 임베딩 파일
+MOOD_FEATURES_PATH = os.getenv("MOOD_FEATURES_PATH", "models/mood_text_features.pt")
+
+def load_mood_text_features(prompts: list, model_name: str):
+    """
+    미리 뽑아둔 무드 텍스트 임베딩을 읽어옴
+    프롬프트나 모델이 바뀌었으면 파일을 다시 만들어야 하므로 에러
+    """
+    import torch
+
+    if not os.path.exists(MOOD_FEATURES_PATH):
+        raise RuntimeError(f"무드 텍스트 임베딩 파일이 없습니다: {MOOD_FEATURES_PATH} (python export_mood_features.py)")
+
+    artifact = torch.load(MOOD_FEATURES_PATH)
+    if artifact["model"] != model_name or artifact["prompts"] != prompts:
+        raise RuntimeError("무드 텍스트 임베딩 파일이 현재 모델/프롬프트와 다릅니다. export_mood_features.py 를 다시 실행해주세요.")
+    return artifact["features"]
 
 class RecommendService:
-    def analyze_mood(self, image_vector: list) -> str:
+    def __init__(self, label_map: dict = None):
+        self.label_map = label_map if label_map is not None else MOOD_LABEL_MAP
+        # 텍스트 임베딩 캐시 (프롬프트나 모델이 바뀌면 다시 계산)
+        self._text_features = None
+        self._text_cache_key = None
+
+    def _get_text_features(self):
         """
-        [기능 구현] 이미지 벡터를 분석해서 가장 어울리는 무드 키워드를 반환
-        CLIP의 Zero-shot Classification 기능을 활용해 텍스트와 이미지의 유사도를 비교함
+        무드 프롬프트들의 정규화된 텍스트 임베딩 행렬 [5, 512] (torch.Tensor)
+        텍스트는 고정이라 한 번만 계산해두고 재사용함
         """
-        # 1. 비교할 무드 카테고리 정의 (영어 프롬프트 -> 한국어 결과 매핑)
-        label_map = {
-            "A peaceful photo of nature, forest, and healing scenery": "자연/힐링",
-            "A retro style cafe with vintage atmosphere and emotional vibe": "레트로/감성카페",
-            "A busy city street at night with neon lights and urban view": "야경/도시",
-            "A dynamic photo of outdoor activities, sports, and excitement": "활동적/액티비티",
-            "A delicious photo of fresh bread, pastries, and a bakery": "맛집/빵지순례"
-        }
-        
-        prompts = list(label_map.keys())
-        
-        # 2. AI 모델 도구 가져오기 (ai_instance에서 빌려쓰기)
-        processor = ai_instance.processor
-        model = ai_instance.model
-        
-        # 3. 텍스트(키워드)를 벡터로 변환
-        inputs = processor(text=prompts, return_tensors="pt", padding=True)
-        
-        # 4. 이미지 벡터(리스트)를 텐서로 변환
-        image_tensor = torch.tensor([image_vector], dtype=torch.float32) # shape: [1, 512]
+        ai_service = get_ai_service()
+        model = ai_service.model
+        prompts = tuple(self.label_map.keys())
+        cache_key = (prompts, id(model))
+
+        if self._text_features is not None and self._text_cache_key == cache_key:
+            return self._text_features
+
+        if ai_service.has_text_tower:
+            text_features = self._compute_text_features(model, list(prompts))
+        else:
+            # 비전 전용 모드: export_mood_features.py 로 미리 뽑아둔 임베딩 사용
+            text_features = load_mood_text_features(list(prompts), ai_service.model_name)
+
+        # 정규화해서 저장
+        self._text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+        self._text_cache_key = cache_key
+        return self._text_features
+
+    def _compute_text_features(self, model, prompts: list):
+        import torch
 
-        # 5. 유사도 계산 (이미지 vs 5가지 무드)
+        # 1. 텍스트(키워드)를 벡터로 변환
+        inputs = get_ai_service().processor(text=prompts, return_tensors="pt", padding=True)
         with torch.no_grad():
-            # 텍스트 특징 추출
-            text_outputs = model.get_text_features(**inputs) 
-            
-            # 모델 버전에 따라 결과가 상자일 수도, 숫자일 수도 있어서 안전하게 처리
-            text_features = text_outputs.pooler_output if hasattr(text_outputs, 'pooler_output') else text_outputs
+            text_outputs = model.get_text_features(**inputs)
 
-            # 정규화 (이제 text_features가 숫자니까 .norm()이 잘 작동할 것)
+        # 모델 버전에 따라 결과가 상자일 수도, 숫자일 수도 있어서 안전하게 처리
+        text_features = text_outputs.pooler_output if hasattr(text_outputs, 'pooler_output') else text_outputs
+        return text_features.float()
+
+    def analyze_moods(self, image_vectors: list) -> list:
+        """
+        여러 이미지 벡터의 무드를 한 번의 행렬곱으로 분류
+        """
+        import torch
+
+        if not image_vectors:
+            return []
+
+        prompts = list(self.label_map.keys())
+
+        # 1. 미리 계산해둔 무드 텍스트 임베딩 가져오기
+        text_features = self._get_text_features()
+
+        # 2. 이미지 벡터(리스트)를 텐서로 변환
+        image_tensor = torch.tensor(image_vectors, dtype=torch.float32) # shape: [N, 512]
+
+        # 3. 유사도 계산 (이미지 vs 5가지 무드) - 행렬곱 한 번
+        with torch.no_grad():
             image_features = image_tensor / image_tensor.norm(dim=-1, keepdim=True)
-            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-            
+
             # 내적을 통해 유사도 확률 계산 (Softmax)
             similarity = (100.0 * image_features @ text_features.T).softmax(dim=-1)
-            
+
             # 가장 점수가 높은 인덱스 찾기
-            values, indices = similarity[0].topk(1)
-            best_match_idx = indices[0].item()
-            
-        # 6. 한국어 키워드 반환
-        best_prompt = prompts[best_match_idx]
-        return label_map[best_prompt]
+            best_match_indices = similarity.argmax(dim=-1).tolist()
+
+        # 4. 한국어 키워드 반환
+        return [self.label_map[prompts[idx]] for idx in best_match_indices]
+
+    def analyze_mood(self, image_vector: list) -> str:
+        """
+        [기능 구현] 이미지 벡터를 분석해서 가장 어울리는 무드 키워드를 반환
+        CLIP의 Zero-shot Classification 기능을 활용해 텍스트와 이미지의 유사도를 비교함
+        """
+        return self.analyze_moods([image_vector])[0]
+
+    def _merge_hits(self, queries: list, per_query: list) -> list:
+        """
+        사진별 [(장소, 거리), ...] 결과를 장소당 가장 가까운 거리 하나로 합침 (SQL 경로와 같은 규칙)
+        """
+        best = {}
+        for (_, detected_mood), results in zip(queries, per_query):
+            for place, distance in results:
+                if distance >= SIMILARITY_THRESHOLD: continue
+                if place.id not in best or distance < best[place.id][1]:
+                    best[place.id] = (place, distance, detected_mood)
+        return sorted(best.values(), key=lambda hit: hit[1])
+
+    def _search_pq_index(self, db: Session, pq_index, queries: list, limit: int) -> list:
+        """
+        1. 압축 코드로 사진마다 후보 PQ_RERANK개
+        2. 전체 후보의 원본 임베딩을 DB에서 한 번에 가져와 정확한 거리로 다시 정렬
+        """
+        vectors = [v for v, _ in queries]
+        candidates = pq_index.search(vectors, k=PQ_RERANK, moods=[mood for _, mood in queries])
+        candidate_ids = {place_id for hits in candidates for place_id, _ in hits}
+        if not candidate_ids:
+            return [[] for _ in queries]
+
+        places = {place.id: place for place in db.scalars(select(Place).where(Place.id.in_(candidate_ids))).all()}
+        per_query = []
+        for vector, hits in zip(vectors, candidates):
+            rows = [places[place_id] for place_id, _ in hits if place_id in places]
+            if not rows:
+                per_query.append([])
+                continue
+            query = np.asarray(vector, dtype=np.float32)
+            matrix = np.asarray([place.embedding for place in rows], dtype=np.float32)
+            similarity = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+            order = np.argsort(-similarity)[:limit]
+            per_query.append([(rows[i], float(1.0 - similarity[i])) for i in order])
+        return per_query
+
+    def _search_similar_places(self, db: Session, queries: list, limit: int = 10, origin: tuple = None) -> list:
+        """
+        (쿼리 벡터, 무드) 목록으로 비슷한 장소를 찾아 [(장소, 거리, 무드), ...] 반환
+        - 사진마다 같은 무드의 가장 가까운 장소 limit개
+        - 같은 장소는 가장 가까운 거리 하나만, 유사도 기준(SIMILARITY_THRESHOLD) 통과한 것만
+        - origin=(위도, 경도)를 주고 GEO_SCORING 을 켜면 가까운 장소에 가산점 (SQL 경로)
+        """
+        if not queries:
+            return []
+
+        # 저장 형식이 PCA 로 줄인 벡터면 쿼리도 같은 투영으로 (무드는 이미 512차원에서 분류됨)
+        queries = list(zip(to_storage_vectors([v for v, _ in queries]), [mood for _, mood in queries]))
+
+        # 압축(IVF-PQ) 인덱스가 있으면 후보를 고르고, 후보만 DB 원본 벡터로 재정렬
+        pq_index = get_pq_index()
+        if pq_index is not None:
+            return self._merge_hits(queries, self._search_pq_index(db, pq_index, queries, limit))
+
+        # 메모리 인덱스를 켜뒀으면 DB 왕복 없이 행렬곱 한 번으로
+        if PLACE_INDEX_ENABLED:
+            place_index.refresh_if_stale(db)
+            per_query = place_index.search(
+                [v for v, _ in queries], k=limit, moods=[mood for _, mood in queries]
+            )
+            return self._merge_hits(queries, per_query)
+
+        # ANN 인덱스 검색 파라미터(ef_search / probes)를 이번 트랜잭션에 적용
+        apply_search_settings(db)
+
+        # 사진 N장을 쿼리 한 번으로: VALUES(사진 벡터들) x LATERAL(사진별 ANN 검색)
+        vector_type = embedding_type()
+        query_table = values(
+            column("qid", Integer), column("vec", vector_type), column("mood", String), name="q"
+        ).data([
+            (qid, cast(literal(vector, vector_type), vector_type), mood)
+            for qid, (vector, mood) in enumerate(queries)
+        ])
+        if PLACE_SEARCH_STRATEGY == "maxsim":
+            # 사진별 임베딩에서 검색 -> 장소마다 가장 비슷한 사진 거리
+            distance = PlaceImage.embedding.cosine_distance(query_table.c.vec)
+            hit_query = (
+                select(PlaceImage.place_id.label("id"), distance.label("distance"))
+                .where(PlaceImage.mood == query_table.c.mood)
+            )
+        else:
+            # 장소마다 centroid 벡터 하나 -> 처음부터 서로 다른 장소만 나옴
+            distance = Place.embedding.cosine_distance(query_table.c.vec)
+            hit_query = (
+                select(Place.id.label("id"), distance.label("distance"))
+                .where(Place.mood == query_table.c.mood)
+            )
+
+        score = distance
+        if origin is not None and GEO_SCORING_ENABLED:
+            # 하이브리드 점수: 코사인 거리 + 현재 위치와의 거리(km) 가중치
+            # ll_to_earth(위도, 경도) 식 GiST 인덱스(ensure_geo_index)로 반경 필터
+            if PLACE_SEARCH_STRATEGY == "maxsim":
+                hit_query = hit_query.join(Place, PlaceImage.place_id == Place.id)
+            center = func.ll_to_earth(origin[0], origin[1])
+            point = func.ll_to_earth(Place.latitude, Place.longitude)
+            geo_km = func.earth_distance(center, point) / 1000.0
+            score = distance + GEO_WEIGHT * geo_km / GEO_SCALE_KM
+            if GEO_RADIUS_KM > 0:
+                hit_query = hit_query.where(
+                    func.earth_box(center, GEO_RADIUS_KM * 1000.0).op("@>")(point),
+                    geo_km < GEO_RADIUS_KM,
+                )
+
+        # 인덱스를 탈 수 있는 정렬 기준으로 후보를 넉넉히 뽑은 뒤 최종 점수로 limit 개
+        # - maxsim: 한 장소의 사진 여러 장이 LIMIT 자리를 차지하지 않게 장소별로 묶음
+        # - 반경 없는 위치 점수: 코사인 거리(ANN)로 먼저 뽑고 위치 점수로 재정렬
+        geo_rerank = score is not distance and GEO_RADIUS_KM <= 0
+        overfetch = (MAXSIM_OVERFETCH if PLACE_SEARCH_STRATEGY == "maxsim" else 1) * (GEO_RERANK if geo_rerank else 1)
+        if overfetch > 1:
+            candidates = (
+                hit_query.add_columns(score.label("score"))
+                .order_by(distance if geo_rerank else score)
+                .limit(limit * overfetch)
+                .correlate(query_table)
+                .lateral("candidates")
+            )
+            if PLACE_SEARCH_STRATEGY == "maxsim":
+                best_score = func.min(candidates.c.score)
+                hit = (
+                    select(
+                        candidates.c.id,
+                        func.min(candidates.c.distance).label("distance"),
+                        best_score.label("score"),
+                    )
+                    .group_by(candidates.c.id)
+                    .order_by(best_score)
+                )
+            else:
+                hit = select(candidates.c.id, candidates.c.distance, candidates.c.score).order_by(candidates.c.score)
+            hit = hit.limit(limit).lateral("hit")
+        else:
+            hit = (
+                hit_query.add_columns(score.label("score"))
+                .order_by(score)
+                .limit(limit)
+                .lateral("hit")
+            )
+
+        # 같은 장소끼리 점수 순위를 매겨서 1등만 남김 (DB 안에서 중복 제거)
+        rank = func.row_number().over(partition_by=hit.c.id, order_by=hit.c.score).label("rank")
+        ranked = (
+            select(hit.c.id, hit.c.distance, hit.c.score, query_table.c.qid, rank)
+            .select_from(query_table.join(hit, true()))
+            .where(hit.c.distance < SIMILARITY_THRESHOLD)
+            .subquery("ranked")
+        )
+        stmt = (
+            select(Place, ranked.c.distance, ranked.c.qid)
+            .join(ranked, Place.id == ranked.c.id)
+            .where(ranked.c.rank == 1)
+            .order_by(ranked.c.score)
+        )
+        return [(place, distance, queries[qid][1]) for place, distance, qid in db.execute(stmt).all()]
+
+    async def analyze_uploads(self, files: List[UploadFile]) -> list:
+        """
+        업로드된 사진들을 벡터화 + 무드 분석 -> [(벡터, 무드), ...] (실패한 사진은 빠짐)
+        """
+        # 벡터화 + 무드 분석은 배치 스케줄러 -> 추론 실행기에서, 이벤트 루프 밖
+        if embedding_scheduler.executor.kind == "thread":
+            # 스레드 풀이면 업로드 스풀 파일을 bytes로 복사하지 않고 그대로 넘김
+            contents = [file.file for file in files]
+        else:
+            # 프로세스 풀로는 파일 객체를 못 넘겨서 bytes로 읽음
+            contents = [await file.read() for file in files]
+        analyzed = await embedding_scheduler.submit_many(contents)
+        return [(v, mood) for v, mood in analyzed if v is not None]
 
     async def get_recommendations(
         self, 
@@ -68,47 +327,41 @@ class RecommendService:
         """
         메인 로직: 이미지 분석 -> 무드 파악 -> 유사 장소 검색 -> 필터링 -> 최단 경로 정렬
         """
-        raw_candidates = []
-        seen_names = set()
-
         # 1. 업로드된 파일들 분석
-        for file in files:
-            content = await file.read()
-            user_vector = ai_instance.image_to_vector(content)
-            
-            if user_vector is None: continue
-
-            # AI가 무드 분석
-            detected_mood = self.analyze_mood(user_vector)
-
-            # 2. 벡터 검색
-            distance_col = Place.embedding.cosine_distance(user_vector).label("distance")
-            stmt = select(Place, distance_col).order_by(distance_col).limit(10)
-            results = db.execute(stmt).all() 
-
-            for row in results:
-                place, distance = row
-                
-                if place.name in seen_names: continue
-
-                if distance < 0.45: # 유사도 기준
-                    # 장소의 무드가 업로드 이미지 무드와 다르면 제외
-                    place_mood = self.analyze_mood(place.embedding)
-                    if place_mood != detected_mood:
-                        continue
-                    raw_candidates.append({
-                        "id": place.id, 
-                        "name": place.name,
-                        "description": place.description,
-                        "address": place.address,   
-                        "image_url": place.image_path,
-                        "lat": place.latitude,
-                        "lng": place.longitude,
-                        "similarity": float(distance),
-                        "mood_tag": detected_mood, # [결과에 추가] 분석된 무드 태그
-                        "place_mood": place_mood
-                    })
-                    seen_names.add(place.name)
+        queries = await self.analyze_uploads(files)
+        return self.recommend(db, queries, current_lat, current_lng)
+
+    def recommend(self, db: Session, queries: list, current_lat: float, current_lng: float):
+        """
+        (벡터, 무드) 쿼리들로 유사 장소 검색 -> 필터링 -> 최단 경로 정렬
+        업로드 사진 분석 결과나 저장된 사용자 취향 벡터(CLIP 추론 없이) 둘 다 여기로
+        """
+        if not queries:
+            return None
+
+        # 같은 동네 + 같은 사진(양자화 벡터) 결과가 캐시에 있으면 검색/경로 계산 생략
+        cache_key = recommendation_cache.make_key(db, queries, current_lat, current_lng)
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # 2. 벡터 검색 (사진 전부를 한 번에, 중복 제거 + 유사도 기준까지 적용된 결과)
+        raw_candidates = []
+        for place, distance, detected_mood in self._search_similar_places(
+            db, queries, origin=(current_lat, current_lng)
+        ):
+            raw_candidates.append({
+                "id": place.id, 
+                "name": place.name,
+                "description": place.description,
+                "address": place.address,   
+                "image_url": place.image_path,
+                "lat": place.latitude,
+                "lng": place.longitude,
+                "similarity": float(distance),
+                "mood_tag": detected_mood, # [결과에 추가] 분석된 무드 태그
+                "place_mood": place.mood
+            })
 
         if not raw_candidates:
             return None 
@@ -129,16 +382,75 @@ class RecommendService:
         
         for brand_name, branches in brand_groups.items():
             if branches:
-                best_branch = min(
-                    branches,
-                    key=lambda p: calculate_distance(current_lat, current_lng, p['lat'], p['lng'])
+                # 지점들까지 거리를 한 번에 계산해서 가장 가까운 지점 하나만
+                distances = haversine_one_to_many(
+                    current_lat, current_lng, [p['lat'] for p in branches], [p['lng'] for p in branches]
                 )
-                final_recommendations.append(best_branch)
+                final_recommendations.append(branches[int(distances.argmin())])
 
-        # 4. 최단 거리 순 정렬
-        sorted_recommendations = sort_by_shortest_path(current_lat, current_lng, final_recommendations)
+        # 4. 최단 경로 순 정렬 (장소 수에 따라 Held-Karp / 2-opt·Or-opt)
+        sorted_recommendations, _ = optimize_route(current_lat, current_lng, final_recommendations)
+        recommendation_cache.put(cache_key, sorted_recommendations)
         
         return sorted_recommendations
 
 # 서비스 인스턴스 생성
 recommend_service = RecommendService()
+
+def embed_and_classify(contents: list) -> list:
+    """
+    업로드 이미지들을 벡터화하고 무드까지 분류 -> [(벡터, 무드), ...]
+    추론 실행기(스레드/프로세스 풀)에서 돌리는 함수라 모듈 최상위에 둠
+    """
+    ensure_worker_warm()
+    vectors = get_ai_service().images_to_vectors(contents)
+    valid_vectors = [v for v in vectors if v is not None]
+    moods = iter(recommend_service.analyze_moods(valid_vectors))
+    return [(v, next(moods) if v is not None else None) for v in vectors]
+
+def classify_moods(vectors: list) -> list:
+    """
+    이미 있는 벡터들(예: 사용자 취향 평균)의 무드만 분류 (텍스트 임베딩이 준비된 추론 실행기에서)
+    """
+    ensure_worker_warm()
+    return recommend_service.analyze_moods(vectors)
+
+def warm_up_models() -> float:
+    """
+    모델 로딩 + 더미 추론 + 무드 텍스트 임베딩 준비 (걸린 시간(초) 반환)
+    서버 시작 때 추론 실행기에서 돌려서 첫 요청이 느리지 않게 함
+    """
+    started = time.perf_counter()
+    vector = get_ai_service().warm_up()
+    if vector is None:
+        raise RuntimeError("워밍업 추론 실패")
+    recommend_service.analyze_mood(vector)
+    return time.perf_counter() - started
+
+# 워커마다 워밍업 결과 (process 모드면 프로세스마다, thread 모드면 스레드마다 따로)
+_worker_state = threading.local()
+
+def warm_up_worker():
+    """
+    추론 실행기 initializer: 워커가 뜰 때 그 워커 안에서 모델 로딩 + 워밍업
+    (여기서 예외가 나면 process 모드 풀은 BrokenProcessPool 로 실패)
+    """
+    _worker_state.warmup_seconds = warm_up_models()
+
+def ensure_worker_warm():
+    """
+    미리 워밍업 안 한 워커(MODEL_PRELOAD=0)는 처음 일을 받을 때 그 워커 안에서 모델 로딩 + 워밍업
+    """
+    if getattr(_worker_state, "warmup_seconds", None) is None:
+        warm_up_worker()
+        print(f"🔥 첫 요청에서 워커 워밍업 완료 ({_worker_state.warmup_seconds:.2f}초)")
+
+def worker_warmup_info() -> tuple:
+    """
+    (워커 식별값, 워밍업 시간) - initializer 가 끝난 워커에서만 실행되므로 돌려받았으면 그 워커는 준비 완료
+    """
+    time.sleep(0.05)    # 한 워커가 확인 작업을 연달아 다 가져가지 않게 잠깐 붙잡아 둠
+    return f"{os.getpid()}:{threading.get_ident()}", getattr(_worker_state, "warmup_seconds", None)
+
+# 동시에 들어온 /analyze 요청들의 사진을 모아서 한 배치로 추론
+embedding_scheduler = BatchScheduler(embed_and_classify)
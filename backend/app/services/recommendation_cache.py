@@ -0,0 +1,120 @@
+# backend/app/services/recommendation_cache.py
+
+import os
+import copy
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from app.db.catalog_version import read_catalog_version
+from app.utils import geohash_encode
+
+# 추천 결과 캐시 설정
+# - RECOMMEND_CACHE_SIZE / RECOMMEND_CACHE_TTL: 최대 개수 / 유효 시간(초)
+# - RECOMMEND_CACHE_GEOHASH: 위치 칸 크기 (geohash 자릿수, 6 = 약 1.2km x 0.6km)
+# - RECOMMEND_CACHE_BITS: 벡터를 줄일 SimHash 비트 수 (작을수록 비슷한 사진끼리 겹칠 가능성이 커지지만 보장은 아님)
+# - CATALOG_VERSION_TTL: 장소 카탈로그 변경 여부를 DB에서 다시 확인하는 주기(초)
+RECOMMEND_CACHE_SIZE = int(os.getenv("RECOMMEND_CACHE_SIZE", "512"))
+RECOMMEND_CACHE_TTL = float(os.getenv("RECOMMEND_CACHE_TTL", "600"))
+RECOMMEND_CACHE_GEOHASH = int(os.getenv("RECOMMEND_CACHE_GEOHASH", "6"))
+RECOMMEND_CACHE_BITS = int(os.getenv("RECOMMEND_CACHE_BITS", "64"))
+CATALOG_VERSION_TTL = float(os.getenv("CATALOG_VERSION_TTL", "30"))
+
+class RecommendationCache:
+    """
+    (양자화된 쿼리 벡터들 + 위치 geohash 칸 + 카탈로그 버전) -> 추천 결과
+    같은 동네에서 같은 유행 사진으로 다시 요청하면 검색/브랜드 필터/경로 계산을 통째로 건너뜀
+    카탈로그 버전이 키에 들어가서 장소가 바뀌면 예전 결과는 자연히 안 쓰임
+    """
+    def __init__(self, max_items=RECOMMEND_CACHE_SIZE, ttl_seconds=RECOMMEND_CACHE_TTL,
+                 geohash_precision=RECOMMEND_CACHE_GEOHASH, bits=RECOMMEND_CACHE_BITS, dim=512):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.geohash_precision = geohash_precision
+        self.bits = bits
+        # 고정 시드 랜덤 초평면 (워커/재시작이 달라도 같은 사진이면 같은 코드)
+        self._hyperplanes = np.random.default_rng(0).standard_normal((dim, bits)).astype(np.float32)
+        self._items = OrderedDict()   # key -> (만료 시각, 결과)
+        self._lock = threading.Lock()
+        self._catalog_version = None
+        self._catalog_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def catalog_version(self, db):
+        """
+        장소/사진 카탈로그 버전 (CATALOG_VERSION_TTL 동안 재사용)
+        places / place_images 에 쓰기가 있을 때마다 트리거가 올리는 번호 (app/db/catalog_version.py)
+        -> 재시딩, centroid 재계산, 저장 형식 변환, backfill_mood, 사진 추가/삭제 모두 잡힘
+        """
+        now = time.monotonic()
+        if self._catalog_version is None or now - self._catalog_checked_at >= CATALOG_VERSION_TTL:
+            version = str(read_catalog_version(db))
+            if self._catalog_version is not None and version != self._catalog_version:
+                print("🗂️ 장소 카탈로그 변경 감지 -> 추천 캐시 비움")
+                self.clear()
+            self._catalog_version = version
+            self._catalog_checked_at = now
+        return self._catalog_version
+
+    def make_key(self, db, queries, lat, lng):
+        """
+        queries: [(벡터, 무드), ...]
+        """
+        # 1. 벡터를 랜덤 초평면 부호 비트(SimHash)로 양자화 -> (코드, 무드) 쌍으로 묶어서 정렬 (사진 순서만 무시)
+        #    완전히 같은 사진은 항상 같은 코드, 재압축/살짝 자른 사진은 같은 코드가 나올 수도 있는 정도
+        #    (64비트면 초평면 근처 값 하나만 뒤집혀도 다른 키 -> 캐시 미스일 뿐 틀린 결과는 아님)
+        matrix = np.asarray([v for v, _ in queries], dtype=np.float32)
+        codes = np.packbits(matrix @ self._hyperplanes > 0, axis=1)
+        quantized = sorted((row.tobytes(), (mood or "").encode("utf-8")) for row, (_, mood) in zip(codes, queries))
+
+        # 2. 위치 칸 + 카탈로그 버전과 합쳐서 해시
+        digest = hashlib.sha256()
+        digest.update(geohash_encode(lat, lng, self.geohash_precision).encode("utf-8"))
+        digest.update(self.catalog_version(db).encode("utf-8"))
+        for code, mood in quantized:
+            digest.update(code)
+            digest.update(mood + b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, result):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(result))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "geohash_precision": self.geohash_precision,
+                "bits": self.bits,
+                "catalog_version": self._catalog_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+# 서비스 인스턴스 생성
+recommendation_cache = RecommendationCache()
@@ -0,0 +1,296 @@
+# backend/app/services/road_router.py
+
+import os
+import math
+import time
+import heapq
+import threading
+import numpy as np
+
+from app.geo import haversine_pairwise, haversine_one_to_many
+from app.utils import calculate_durations, WALK_MAX_KM, WALK_SPEED_KMH
+
+# 오프라인 도로망 (build_road_graph.py 가 OSM 추출본으로 생성, 없으면 직선 거리 기준으로 동작)
+# - ROAD_GRAPH_PATH: 도로망 파일 (.npz)
+# - ROAD_SNAP_MAX_KM: 좌표를 도로 노드에 붙일 최대 거리 (더 멀면 그 구간은 직선 거리로)
+# - ROAD_DRIVE_MAX_MIN: 차량 탐색을 멈추는 시간 (분, 이보다 먼 구간은 직선 거리 기준)
+#   비우면 도로망 범위로 정함: 대각선 길이 x _DRIVE_DETOUR 를 차량 도로 중간 속도로 가는 시간
+#   (추출본 끝에서 끝까지 가는 데 필요한 만큼 - 일방통행 때문에 못 가는 도착지가 있어도 그 이상은 안 뒤짐)
+ROAD_GRAPH_PATH = os.getenv("ROAD_GRAPH_PATH", "models/road_graph.npz")
+ROAD_SNAP_MAX_KM = float(os.getenv("ROAD_SNAP_MAX_KM", "0.5"))
+ROAD_DRIVE_MAX_MIN = float(os.getenv("ROAD_DRIVE_MAX_MIN") or "nan")
+
+PROFILES = ("walk", "drive")
+# 좌표 -> 가까운 노드 찾기용 격자 칸 크기 (도, 약 1km)
+_GRID_DEGREES = 0.01
+# 도로망 범위로 차량 탐색 상한을 정할 때 쓰는 우회 비율 (도로 길이 / 직선 거리)
+_DRIVE_DETOUR = 1.5
+# 위도 1도 길이 (m, 가장 짧은 적도 기준) - A* 하한 거리 계산용
+_METERS_PER_LAT_DEGREE = 110_574
+# 탐색 중 마감 시각을 몇 번 꺼낼 때마다 확인할지 (매번 보면 시계 호출이 더 비쌈)
+_DEADLINE_CHECK_EVERY = 512
+
+class _Profile:
+    """
+    프로필(걷기/차량) 하나의 CSR 그래프 (정방향 + 역방향) + 스냅용 격자
+    탐색 루프에서 numpy 원소 접근이 느려서 CSR 배열은 파이썬 리스트로 들고 있음
+    """
+    def __init__(self, arrays, name, node_lat, node_lng):
+        self.forward = tuple(arrays[f"{name}_{part}"].tolist() for part in ("indptr", "indices", "seconds", "meters"))
+        self.backward = tuple(arrays[f"{name}_rev_{part}"].tolist() for part in ("indptr", "indices", "seconds", "meters"))
+
+        # 스냅 대상: 이 프로필의 가장 큰 연결 요소에 속한 노드만 (고립된 사유지 도로 등에 붙지 않게)
+        snap_nodes = arrays[f"{name}_snap"]
+        cells = self._cells(node_lat[snap_nodes], node_lng[snap_nodes])
+        order = np.argsort(cells, kind="stable")
+        self.snap_nodes = snap_nodes[order]
+        self.snap_cells = cells[order]
+        self.node_lat = node_lat
+        self.node_lng = node_lng
+
+        # A* 하한용: 이 프로필에서 가장 빠른 간선 속도 (m/s) + 파이썬 리스트 좌표 (탐색 루프용)
+        edge_seconds = arrays[f"{name}_seconds"]
+        edge_meters = arrays[f"{name}_meters"]
+        moving = edge_seconds > 0
+        self.max_mps = float((edge_meters[moving] / edge_seconds[moving]).max()) if moving.any() else 0.0
+        self.median_mps = float(np.median(edge_meters[moving] / edge_seconds[moving])) if moving.any() else 0.0
+        self.lat_list = node_lat.tolist()
+        self.lng_list = node_lng.tolist()
+        # 경도 1도 길이는 가장 북쪽 위도 기준 (짧게 잡아야 하한이 됨) + 평면 근사 오차만큼 조금 더 줄임
+        max_abs_lat = float(np.abs(node_lat).max()) if len(node_lat) else 0.0
+        self.meters_per_lat_degree = _METERS_PER_LAT_DEGREE * 0.999
+        self.meters_per_lng_degree = _METERS_PER_LAT_DEGREE * math.cos(math.radians(max_abs_lat)) * 0.999
+
+    @staticmethod
+    def _cells(lats, lngs):
+        rows = np.floor(np.asarray(lats) / _GRID_DEGREES).astype(np.int64)
+        cols = np.floor(np.asarray(lngs) / _GRID_DEGREES).astype(np.int64)
+        return rows * 100000 + cols
+
+    def snap(self, lat, lng, max_km=ROAD_SNAP_MAX_KM):
+        """
+        가장 가까운 노드 (노드 번호, 거리 km) - max_km 안에 없으면 (-1, inf)
+        주변 3x3 격자 칸만 보고, 없으면 한 칸씩 넓혀 봄
+        """
+        row = int(np.floor(lat / _GRID_DEGREES))
+        col = int(np.floor(lng / _GRID_DEGREES))
+        max_ring = int(np.ceil(max_km / (_GRID_DEGREES * 88))) + 1     # 경도 1칸 ≈ 0.9km (대전 위도)
+        for ring in range(1, max_ring + 1):
+            keys = np.asarray([
+                (row + dr) * 100000 + (col + dc)
+                for dr in range(-ring, ring + 1) for dc in range(-ring, ring + 1)
+            ], dtype=np.int64)
+            starts = np.searchsorted(self.snap_cells, keys, side="left")
+            ends = np.searchsorted(self.snap_cells, keys, side="right")
+            candidates = np.concatenate([self.snap_nodes[s:e] for s, e in zip(starts, ends)])
+            if len(candidates):
+                distances = haversine_one_to_many(lat, lng, self.node_lat[candidates], self.node_lng[candidates])
+                best = int(distances.argmin())
+                if distances[best] <= max_km:
+                    return int(candidates[best]), float(distances[best])
+        return -1, float("inf")
+
+    def _box_bound(self, targets):
+        """
+        도착 노드들을 감싸는 위도/경도 상자 -> 노드에서 상자까지 걸리는 최소 시간(초) 함수
+        상자까지 직선 거리 / 가장 빠른 간선 속도라서 어떤 도착지까지의 실제 시간보다도 작거나 같음 (A* 하한)
+        """
+        lats = [self.lat_list[node] for node in targets]
+        lngs = [self.lng_list[node] for node in targets]
+        lat_lo, lat_hi, lng_lo, lng_hi = min(lats), max(lats), min(lngs), max(lngs)
+        lat_lists, lng_lists = self.lat_list, self.lng_list
+        ky = self.meters_per_lat_degree / self.max_mps
+        kx = self.meters_per_lng_degree / self.max_mps
+
+        def bound(node):
+            lat = lat_lists[node]
+            lng = lng_lists[node]
+            dy = lat_lo - lat if lat < lat_lo else (lat - lat_hi if lat > lat_hi else 0.0)
+            dx = lng_lo - lng if lng < lng_lo else (lng - lng_hi if lng > lng_hi else 0.0)
+            return math.hypot(dy * ky, dx * kx)
+        return bound
+
+    def search(self, source, targets, reverse=False, max_seconds=float("inf"), deadline=None):
+        """
+        한 출발 노드에서 여러 도착 노드까지 최단 시간 (도착 노드를 다 찾으면 바로 멈춤)
+        출발 노드가 도착 노드들 범위(위도/경도 상자) 밖이면 A* (상자까지 직선 거리 / 최고 속도를 하한으로)
+        - 하한이 일관적(consistent)이라 꺼낸 순간의 시간이 최단 시간 -> Dijkstra 와 결과가 같고 상자 반대쪽은 덜 뒤짐
+        - 출발 노드가 상자 안이면 하한이 거의 0이라 그냥 Dijkstra (하한 계산 비용만 늘어서)
+        reverse=True 면 역방향 그래프 (여러 곳 -> 한 곳, 일방통행 고려)
+        deadline(perf_counter 시각)이 지나면 그때까지 찾은 곳만 돌려줌
+        return: {도착 노드: (초, 미터)}
+        """
+        indptr, indices, seconds, meters = self.backward if reverse else self.forward
+        remaining = set(targets)
+        if not remaining:
+            return {}
+        bound = self._box_bound(remaining) if self.max_mps > 0 else None
+        if bound is not None and bound(source) <= 0:
+            bound = None
+
+        found = {}
+        best = {source: 0.0}
+        heap = [(bound(source) if bound else 0.0, 0.0, 0.0, source)]
+        popped = 0
+        while heap and remaining:
+            popped += 1
+            if deadline is not None and popped % _DEADLINE_CHECK_EVERY == 0 and time.perf_counter() > deadline:
+                break
+            estimate, cost, length, node = heapq.heappop(heap)
+            if cost > best.get(node, float("inf")):
+                continue
+            # 꺼내는 순서(추정값)가 max_seconds 를 넘으면 남은 도착지도 전부 넘음 (도착지에선 하한 = 0)
+            if estimate > max_seconds:
+                break
+            if node in remaining:
+                remaining.discard(node)
+                found[node] = (cost, length)
+            for edge in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[edge]
+                new_cost = cost + seconds[edge]
+                if new_cost < best.get(neighbor, float("inf")):
+                    best[neighbor] = new_cost
+                    new_estimate = new_cost + bound(neighbor) if bound else new_cost
+                    heapq.heappush(heap, (new_estimate, new_cost, length + meters[edge], neighbor))
+        return found
+
+class RoadGraph:
+    """
+    걷기 / 차량 프로필 도로망으로 구간 시간/거리 행렬 계산
+    출발/도착 좌표는 가까운 도로 노드에 붙이고, 붙인 거리만큼은 걸어서 이동한다고 봄
+    """
+    def __init__(self, arrays):
+        self.node_lat = np.asarray(arrays["node_lat"], dtype=np.float64)
+        self.node_lng = np.asarray(arrays["node_lng"], dtype=np.float64)
+        self.profiles = {name: _Profile(arrays, name, self.node_lat, self.node_lng) for name in PROFILES}
+
+    def drive_max_seconds(self):
+        """
+        차량 탐색 상한 (초) - ROAD_DRIVE_MAX_MIN 이 없으면 도로망 범위(대각선)로 계산
+        """
+        if not math.isnan(ROAD_DRIVE_MAX_MIN):
+            return ROAD_DRIVE_MAX_MIN * 60
+        drive = self.profiles["drive"]
+        if len(self.node_lat) == 0 or drive.median_mps <= 0:
+            return float("inf")
+        diagonal_km = float(haversine_one_to_many(
+            self.node_lat.min(), self.node_lng.min(), [self.node_lat.max()], [self.node_lng.max()]
+        )[0])
+        return diagonal_km * 1000 * _DRIVE_DETOUR / drive.median_mps
+
+    @classmethod
+    def load(cls, path=ROAD_GRAPH_PATH):
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    @staticmethod
+    def _snap_all(graph, lats, lngs, deadline):
+        # 스냅도 좌표마다 numpy 호출이라 장소가 많으면 오래 걸림 -> 마감이 지나면 나머지는 스냅 실패로
+        snapped = []
+        for lat, lng in zip(lats, lngs):
+            if deadline is not None and time.perf_counter() > deadline:
+                snapped.append((-1, float("inf")))
+            else:
+                snapped.append(graph.snap(lat, lng))
+        return snapped
+
+    def legs(self, profile, src_lats, src_lngs, dst_lats, dst_lngs, max_seconds=float("inf"), deadline=None):
+        """
+        출발 좌표들 x 도착 좌표들 구간 (초 [m, n], 미터 [m, n]) - 못 가는 구간은 inf
+        출발지가 도착지보다 많으면 역방향 그래프로 도착지마다 한 번씩 탐색 (탐색 횟수 = min(m, n))
+        deadline 이 지나면 남은 스냅/탐색은 건너뜀 (못 찾은 구간은 inf)
+        """
+        graph = self.profiles[profile]
+        walk_mps = WALK_SPEED_KMH * 1000 / 3600
+        sources = self._snap_all(graph, src_lats, src_lngs, deadline)
+        targets = self._snap_all(graph, dst_lats, dst_lngs, deadline)
+
+        seconds = np.full((len(sources), len(targets)), np.inf)
+        meters = np.full((len(sources), len(targets)), np.inf)
+        reverse = len(sources) > len(targets)
+        origins, others = (targets, sources) if reverse else (sources, targets)
+        other_nodes = {node for node, _ in others if node >= 0}
+
+        for i, (node, snap_km) in enumerate(origins):
+            if node < 0 or (deadline is not None and time.perf_counter() > deadline):
+                continue
+            budget = max_seconds - snap_km * 1000 / walk_mps
+            found = graph.search(node, other_nodes, reverse=reverse, max_seconds=budget, deadline=deadline)
+            for j, (other, other_km) in enumerate(others):
+                if other not in found:
+                    continue
+                cost, length = found[other]
+                access_m = (snap_km + other_km) * 1000
+                row, col = (j, i) if reverse else (i, j)
+                seconds[row, col] = cost + access_m / walk_mps
+                meters[row, col] = length + access_m
+
+        # 같은 좌표끼리는 0
+        same = haversine_pairwise(src_lats, src_lngs, dst_lats, dst_lngs) < 1e-6
+        seconds[same] = 0.0
+        meters[same] = 0.0
+        return seconds, meters
+
+def road_graph_signature(path=ROAD_GRAPH_PATH):
+    """
+    도로망 파일 식별값 (크기 + 수정 시각) - 바뀌면 이동 행렬도 다시 만들어야 함
+    """
+    if not path or not os.path.exists(path):
+        return "none"
+    stat = os.stat(path)
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+_road_graph = None
+_road_graph_loaded = False
+_road_graph_lock = threading.Lock()
+
+def get_road_graph():
+    """
+    도로망 파일이 있으면 한 번만 읽어옴 (없으면 None -> 직선 거리 기준)
+    """
+    global _road_graph, _road_graph_loaded
+    if not _road_graph_loaded:
+        with _road_graph_lock:
+            if not _road_graph_loaded:
+                if ROAD_GRAPH_PATH and os.path.exists(ROAD_GRAPH_PATH):
+                    _road_graph = RoadGraph.load(ROAD_GRAPH_PATH)
+                    print(f"🛣️ 도로망 로딩: 노드 {len(_road_graph.node_lat)}개 ({ROAD_GRAPH_PATH})")
+                _road_graph_loaded = True
+    return _road_graph
+
+def compute_legs(src_lats, src_lngs, dst_lats, dst_lngs, deadline=None):
+    """
+    출발 좌표들 x 도착 좌표들 구간 (거리 km, 시간 분, 도보 여부) [m, n]
+    - 도로망이 있으면: 걸어서 1km 미만이면 도보, 아니면 차량 도로로 (못 가는 / 차량 탐색 상한 넘는 구간만 직선 기준)
+    - deadline(perf_counter 시각)까지 못 찾은 구간도 직선 기준
+    - 순수 파이썬 탐색(출발지가 도착지들 범위 밖이면 A*)이라 CPU를 씀 -> async 핸들러에서는 스레드풀로 돌려야 함
+    - 없으면: 직선 거리 + calculate_duration 과 같은 기준
+    """
+    straight_km = haversine_pairwise(src_lats, src_lngs, dst_lats, dst_lngs)
+    distance_km = straight_km
+    duration_min = calculate_durations(straight_km)
+    walk = straight_km < WALK_MAX_KM
+
+    graph = get_road_graph()
+    if graph is None or straight_km.size == 0:
+        return distance_km, duration_min, walk
+
+    # 걷기는 1km 안쪽만 의미가 있어서 그 시간 안에서만 탐색
+    walk_limit = WALK_MAX_KM * 1000 / (WALK_SPEED_KMH * 1000 / 3600)
+    walk_seconds, walk_meters = graph.legs(
+        "walk", src_lats, src_lngs, dst_lats, dst_lngs, max_seconds=walk_limit, deadline=deadline
+    )
+    drive_seconds, drive_meters = graph.legs(
+        "drive", src_lats, src_lngs, dst_lats, dst_lngs, max_seconds=graph.drive_max_seconds(), deadline=deadline
+    )
+
+    walk = walk_meters < WALK_MAX_KM * 1000
+    road_km = np.where(walk, walk_meters, drive_meters) / 1000
+    road_min = np.where(walk, walk_seconds, drive_seconds) / 60
+    reachable = np.isfinite(road_min)
+
+    # 도로로 못 가는 구간(스냅 실패, 끊긴 도로, 시간 초과)은 직선 기준 그대로
+    distance_km = np.where(reachable, road_km, straight_km)
+    duration_min = np.where(reachable, road_min, duration_min)
+    walk = np.where(reachable, walk, straight_km < WALK_MAX_KM)
+    return distance_km, duration_min, walk
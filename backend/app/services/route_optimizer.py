@@ -0,0 +1,259 @@
+# backend/app/services/route_optimizer.py
+
+import os
+import time
+import numpy as np
+
+from app.services.travel_matrix import travel_matrix
+from app.services.road_router import compute_legs
+
+# 경로 최적화 설정
+# - ROUTE_SOLVER: auto(기본, 장소 수에 따라 exact / local) / exact / local / greedy
+# - ROUTE_EXACT_MAX: 이 개수 이하면 Held-Karp DP로 정확한 최적 경로 (2^n * n 메모리라 ~12가 한계)
+# - ROUTE_TIME_BUDGET_MS: 그보다 많으면 2-opt / Or-opt 지역 탐색을 이 시간 안에서만
+# - ROUTE_COST: 최소화할 값 distance(기본, 총 거리) / duration(총 이동 시간)
+ROUTE_SOLVER = os.getenv("ROUTE_SOLVER", "auto")
+ROUTE_EXACT_MAX = int(os.getenv("ROUTE_EXACT_MAX", "12"))
+ROUTE_TIME_BUDGET_MS = float(os.getenv("ROUTE_TIME_BUDGET_MS", "50"))
+ROUTE_COST = os.getenv("ROUTE_COST", "distance")
+
+# 지역 탐색에서 개선으로 치는 최소 차이 (부동소수 오차로 같은 이동을 반복하지 않게)
+_EPS = 1e-9
+
+def _with_end_node(cost, return_to_start):
+    """
+    [출발지 + 장소 n개] 비용 행렬에 도착 노드를 붙인 [n+2, n+2] 행렬
+    - 열린 경로: 어느 장소에서 끝나도 비용 0
+    - 출발지 복귀: 도착 노드 = 출발지 (마지막 장소 -> 출발지 비용)
+    이렇게 하면 두 경우 모두 '0에서 시작해 도착 노드에서 끝나는 경로' 하나로 풀 수 있음
+    """
+    size = len(cost)
+    extended = np.zeros((size + 1, size + 1), dtype=np.float64)
+    extended[:size, :size] = cost
+    if return_to_start:
+        extended[:size, size] = cost[:, 0]
+    extended[size, :] = np.inf
+    extended[np.arange(size + 1), np.arange(size + 1)] = 0.0
+    return extended
+
+def held_karp(cost):
+    """
+    도착 노드가 붙은 비용 행렬로 정확한 최적 방문 순서 (장소 번호 1..n)
+    같은 크기의 부분집합들을 한 번에 numpy로 계산 (부분집합 크기마다 반복 1번)
+    """
+    n = len(cost) - 2
+    end = n + 1
+    if n == 0:
+        return []
+    places = np.arange(n)
+    bits = 1 << places
+    between = cost[1:end, 1:end]                # [n, n] 장소 -> 장소
+
+    dp = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int64)
+    dp[bits, places] = cost[0, 1:end]
+
+    masks = np.arange(1 << n)
+    sizes = np.array([bin(mask).count("1") for mask in range(1 << n)])
+    for size in range(2, n + 1):
+        layer = masks[sizes == size]
+        previous = dp[layer[:, None] ^ bits[None, :]]              # [m, j, k]: j를 빼고 k에서 끝난 비용
+        total = previous + between.T[None, :, :]                    # k -> j 이동 비용 더하기
+        best = total.argmin(axis=2)
+        value = np.take_along_axis(total, best[:, :, None], axis=2)[:, :, 0]
+        inside = (layer[:, None] & bits[None, :]) != 0
+        dp[layer] = np.where(inside, value, np.inf)
+        parent[layer] = np.where(inside, best, -1)
+
+    full = (1 << n) - 1
+    last = int(np.argmin(dp[full] + cost[1:end, end]))
+    order = []
+    mask = full
+    while last >= 0:
+        order.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    return order[::-1]
+
+def nearest_neighbor(cost):
+    """
+    가장 가까운 곳부터 차례로 (지역 탐색의 시작 경로 / greedy 모드)
+    """
+    n = len(cost) - 2
+    visited = np.zeros(len(cost), dtype=bool)
+    visited[0] = visited[n + 1] = True
+    order = []
+    current = 0
+    for _ in range(n):
+        distances = np.where(visited, np.inf, cost[current])
+        current = int(distances.argmin())
+        visited[current] = True
+        order.append(current)
+    return order
+
+def _two_opt(cost, tour, deadline):
+    """
+    경로 구간 하나를 뒤집어서 짧아지면 적용 (시작/도착 노드는 고정)
+    비대칭 비용도 되도록 뒤집힌 구간 내부 비용 차이를 누적합으로 계산
+    """
+    improved = False
+    last = len(tour) - 2
+    i = 1
+    while i < last:
+        if time.perf_counter() > deadline:
+            break
+        forward = np.concatenate([[0.0], np.cumsum(cost[tour[:-1], tour[1:]])])
+        backward = np.concatenate([[0.0], np.cumsum(cost[tour[1:], tour[:-1]])])
+        js = np.arange(i + 1, last + 1)
+        a, ti = tour[i - 1], tour[i]
+        tj, b = tour[js], tour[js + 1]
+        inner = (backward[js] - backward[i]) - (forward[js] - forward[i])
+        delta = cost[a, tj] + cost[ti, b] - cost[a, ti] - cost[tj, b] + inner
+        best = int(delta.argmin())
+        if delta[best] < -_EPS:
+            j = int(js[best])
+            tour[i:j + 1] = tour[i:j + 1][::-1]
+            improved = True
+            continue
+        i += 1
+    return improved
+
+def _or_opt(cost, tour, deadline, max_segment=3):
+    """
+    연속한 장소 1~3개를 떼어서 다른 자리에 끼워 넣었을 때 짧아지면 적용
+    """
+    improved = False
+    last = len(tour) - 2
+    for length in range(1, max_segment + 1):
+        start = 1
+        while start + length - 1 <= last:
+            if time.perf_counter() > deadline:
+                return improved
+            end = start + length - 1
+            p, q = tour[start - 1], tour[end + 1]
+            head, tail = tour[start], tour[end]
+            removed = cost[p, head] + cost[tail, q] - cost[p, q]
+
+            rest = np.concatenate([tour[:start], tour[end + 1:]])
+            ks = np.arange(len(rest) - 1)
+            u, v = rest[ks], rest[ks + 1]
+            added = cost[u, head] + cost[tail, v] - cost[u, v]
+            delta = added - removed
+            delta[start - 1] = np.inf                       # 원래 자리
+            best = int(delta.argmin())
+            if delta[best] < -_EPS:
+                segment = tour[start:end + 1].copy()
+                tour[:] = np.concatenate([rest[:best + 1], segment, rest[best + 1:]])
+                improved = True
+                continue
+            start += 1
+    return improved
+
+def local_search(cost, order, time_budget_ms):
+    """
+    시작 경로를 2-opt -> Or-opt 반복으로 더 개선되지 않거나 시간 예산이 끝날 때까지 다듬음
+    """
+    if len(order) < 3:
+        return list(order)
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    tour = np.asarray([0] + list(order) + [len(cost) - 1], dtype=np.int64)
+    while time.perf_counter() < deadline:
+        improved = _two_opt(cost, tour, deadline)
+        improved = _or_opt(cost, tour, deadline) or improved
+        if not improved:
+            break
+    return tour[1:-1].tolist()
+
+def solve_route(cost, return_to_start=False, solver=ROUTE_SOLVER, time_budget_ms=ROUTE_TIME_BUDGET_MS):
+    """
+    cost: [n+1, n+1] 비용 행렬 (0번 = 출발지, 1..n = 장소)
+    return: (방문 순서(장소 번호 1..n), 사용한 solver 이름)
+    """
+    extended = _with_end_node(np.asarray(cost, dtype=np.float64), return_to_start)
+    n = len(cost) - 1
+    if solver == "auto":
+        solver = "exact" if n <= ROUTE_EXACT_MAX else "local"
+
+    if solver == "exact":
+        if n > max(ROUTE_EXACT_MAX, 16):
+            raise ValueError(f"장소 {n}곳은 정확한 풀이(Held-Karp)로 풀기엔 너무 많아")
+        return held_karp(extended), solver
+    if solver == "greedy":
+        return nearest_neighbor(extended), solver
+    if solver == "local":
+        return local_search(extended, nearest_neighbor(extended), time_budget_ms), solver
+    raise ValueError(f"지원하지 않는 경로 solver: {solver} (auto / exact / local / greedy)")
+
+def build_leg_matrices(start_lat, start_lng, places, deadline=None):
+    """
+    출발지(0번) + 장소들 사이 구간 거리(km) / 이동 시간(분) / 도보 여부 행렬 [n+1, n+1]
+    - 카탈로그 장소끼리 구간은 미리 계산한 이동 행렬(travel_matrix)에서 꺼냄
+    - 출발지 구간과 행렬에 없는 장소가 낀 구간만 실시간 계산 (도로망이 있으면 도로 기준)
+    - deadline(perf_counter 시각)이 지나면 실시간 도로 탐색을 멈추고 나머지 구간은 직선 기준
+    """
+    lats = np.asarray([start_lat] + [p["lat"] for p in places], dtype=np.float64)
+    lngs = np.asarray([start_lng] + [p["lng"] for p in places], dtype=np.float64)
+    size = len(lats)
+    matrices = [np.zeros((size, size)), np.zeros((size, size)), np.zeros((size, size), dtype=bool)]
+
+    place_ids = [p.get("id") for p in places]
+    cached = travel_matrix.legs(place_ids, ("distance_km", "duration_min", "walk"))
+    if cached is None:
+        cached = [np.full((size - 1, size - 1), np.nan) for _ in range(3)]
+    for matrix, values in zip(matrices, cached):
+        matrix[1:, 1:] = np.nan_to_num(values) if matrix.dtype == bool else values
+
+    # 실시간으로 계산할 지점: 출발지 + 행렬에 없는 장소 (행렬에 있는 장소는 대각선이 0, 없으면 NaN)
+    live = np.concatenate([[0], 1 + np.flatnonzero(np.isnan(np.diagonal(cached[0])))])
+    outgoing = compute_legs(lats[live], lngs[live], lats, lngs, deadline)     # 실시간 지점 -> 전체
+    incoming = compute_legs(lats, lngs, lats[live], lngs[live], deadline)     # 전체 -> 실시간 지점
+    for matrix, row_values, col_values in zip(matrices, outgoing, incoming):
+        matrix[live, :] = row_values
+        matrix[:, live] = col_values
+
+    for matrix in matrices:
+        np.fill_diagonal(matrix, 0)
+    return matrices
+
+def optimize_route(start_lat, start_lng, places, return_to_start=False, solver=ROUTE_SOLVER,
+                   time_budget_ms=ROUTE_TIME_BUDGET_MS, cost=ROUTE_COST):
+    """
+    현재 위치에서 출발해서 총 이동 거리(또는 시간)가 가장 짧은 순서로 정렬
+    각 장소에 이전 지점에서 오는 duration(분) / transport(도보/차량)를 붙임
+    return: (정렬된 장소 목록, 요약 {total_km, total_min, return_min, solver})
+    """
+    if not places:
+        return [], {"total_km": 0.0, "total_min": 0, "return_min": None, "solver": None}
+
+    distances, durations, walks = build_leg_matrices(start_lat, start_lng, places)
+    costs = durations if cost == "duration" else distances
+    order, used_solver = solve_route(costs, return_to_start, solver, time_budget_ms)
+
+    sorted_places = []
+    total_km = 0.0
+    total_min = 0
+    previous = 0
+    for node in order:
+        place = places[node - 1]
+        dist = distances[previous, node]
+        place["duration"] = int(round(durations[previous, node]))    # 예: 15 (분)
+        place["transport"] = "도보" if walks[previous, node] else "차량"   # 예: "차량"
+        sorted_places.append(place)
+        total_km += dist
+        total_min += place["duration"]
+        previous = node
+
+    return_min = None
+    if return_to_start:
+        total_km += distances[previous, 0]
+        return_min = int(round(durations[previous, 0]))
+        total_min += return_min
+
+    summary = {
+        "total_km": round(float(total_km), 3),
+        "total_min": total_min,
+        "return_min": return_min,
+        "solver": used_solver,
+    }
+    return sorted_places, summary
@@ -0,0 +1,93 @@
+# backend/app/services/taste_service.py
+
+import os
+from datetime import datetime
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models import User
+from app.db.embedding_storage import CLIP_DIM
+from app.services.inference_executor import inference_executor
+from app.services.recommend_service import classify_moods
+
+# 취향 벡터 가중치 (사진 한 장당)
+# - 분석(/analyze)에 올린 사진 < 장소 사진(/places/{id}/photo) < 방문 인증(/visits)
+# - TASTE_MAX_WEIGHT: 가중치 합 상한. 넘으면 예전 기록을 그만큼 줄여서 최근 취향이 계속 반영되게 함
+TASTE_ANALYZE_WEIGHT = float(os.getenv("TASTE_ANALYZE_WEIGHT", "1.0"))
+TASTE_PHOTO_WEIGHT = float(os.getenv("TASTE_PHOTO_WEIGHT", "1.5"))
+TASTE_VISIT_WEIGHT = float(os.getenv("TASTE_VISIT_WEIGHT", "2.0"))
+TASTE_MAX_WEIGHT = float(os.getenv("TASTE_MAX_WEIGHT", "50"))
+
+def ensure_taste_columns(engine):
+    """
+    기존 users 테이블에 취향 컬럼이 없으면 추가 (create_all은 이미 있는 테이블에 컬럼을 추가해주지 않음)
+    """
+    with engine.connect() as conn:
+        conn.execute(text(f"ALTER TABLE users ADD COLUMN IF NOT EXISTS taste_vector vector({CLIP_DIM})"))
+        conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS taste_weight DOUBLE PRECISION DEFAULT 0"))
+        conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS taste_mood VARCHAR"))
+        conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS taste_updated_at TIMESTAMP"))
+        conn.commit()
+
+def blend_taste(current, current_weight, vectors, weight, max_weight=TASTE_MAX_WEIGHT):
+    """
+    누적 가중 평균: (기존 평균 * 기존 가중치 + 새 벡터들 * weight) / 가중치 합
+    각 벡터는 정규화해서 더함 (사진마다 벡터 크기가 달라도 한 장이 평균을 끌고 가지 않게)
+    return: (정규화된 새 취향 벡터, 새 가중치 합 (max_weight 이하))
+    """
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, CLIP_DIM)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    added_weight = weight * len(matrix)
+    total = matrix.sum(axis=0) * weight
+    if added_weight > max_weight:
+        # 한 번에 상한보다 많이 올리면 새 사진들끼리 상한만큼의 비중을 나눠 가짐
+        total *= max_weight / added_weight
+        added_weight = max_weight
+
+    current_weight = current_weight or 0.0
+    if current is not None and current_weight > 0:
+        # 상한을 넘으면 예전 기록의 비중을 줄임 (지수 이동 평균처럼 동작)
+        current_weight = min(current_weight, max(max_weight - added_weight, 0.0))
+        total += np.asarray(current, dtype=np.float32) * current_weight
+
+    new_weight = current_weight + added_weight
+    mean = total / new_weight
+    return mean / np.linalg.norm(mean), new_weight
+
+class TasteService:
+    async def record(self, db: Session, user_id: int, vectors: list, weight: float):
+        """
+        사용자 취향 벡터에 새 사진 벡터들을 반영하고 무드 태그도 다시 계산
+        1. 행 잠금(FOR UPDATE) 상태로 누적 평균 갱신 -> 커밋 (동시에 들어온 업데이트가 서로 덮어쓰지 않게)
+        2. 새 평균의 무드를 추론 실행기에서 분류 (텍스트 임베딩만 쓰는 행렬곱, 이미지 추론 없음)
+        """
+        vectors = [v for v in vectors if v is not None]
+        if not vectors:
+            return None
+
+        user = db.query(User).filter(User.id == user_id).with_for_update().first()
+        if user is None:
+            db.rollback()
+            return None
+        taste, taste_weight = blend_taste(user.taste_vector, user.taste_weight, vectors, weight)
+        user.taste_vector = taste.tolist()
+        user.taste_weight = taste_weight
+        user.taste_updated_at = datetime.now()
+        db.commit()
+
+        user.taste_mood = (await inference_executor.run(classify_moods, [taste.tolist()]))[0]
+        db.commit()
+        return user
+
+    def get_query(self, db: Session, user_id: int):
+        """
+        저장된 취향 -> 검색 쿼리 [(벡터, 무드)] (취향이 아직 없으면 None)
+        """
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None or user.taste_vector is None or user.taste_mood is None:
+            return None
+        return [(np.asarray(user.taste_vector, dtype=np.float32).tolist(), user.taste_mood)]
+
+# 서비스 인스턴스 생성
+taste_service = TasteService()
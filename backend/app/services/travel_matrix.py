@@ -0,0 +1,160 @@
+# backend/app/services/travel_matrix.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from sqlalchemy import select
+
+from app.db.models import Place
+from app.services.road_router import compute_legs, road_graph_signature
+
+# 카탈로그 장소끼리의 이동 거리/시간 행렬 (build_travel_matrix.py / 시딩 때 생성)
+# - TRAVEL_MATRIX_DIR: 행렬 파일 폴더 (.npy 를 mmap 으로 열어서 워커들이 페이지 캐시를 같이 씀)
+# - TRAVEL_MATRIX_CHECK_SECONDS: 새 버전이 만들어졌는지 확인하는 주기(초)
+TRAVEL_MATRIX_DIR = os.getenv("TRAVEL_MATRIX_DIR", "models/travel_matrix")
+TRAVEL_MATRIX_CHECK_SECONDS = float(os.getenv("TRAVEL_MATRIX_CHECK_SECONDS", "30"))
+
+# 현재 버전을 가리키는 파일 (버전별 .npy 를 다 쓴 뒤 이 파일만 바꿔치기 -> 읽는 쪽은 항상 완성된 버전)
+POINTER_FILE = "current.json"
+ARRAYS = ("ids", "distance_km", "duration_min", "walk")
+
+def _array_path(directory, version, name):
+    return os.path.join(directory, f"{version}_{name}.npy")
+
+def catalog_fingerprint(ids, lats, lngs):
+    """
+    장소 id + 좌표 + 도로망 파일 해시 (같으면 행렬을 다시 만들 필요 없음)
+    """
+    digest = hashlib.sha1(road_graph_signature().encode())
+    digest.update(np.asarray(ids, dtype=np.int64).tobytes())
+    digest.update(np.asarray(lats, dtype=np.float64).tobytes())
+    digest.update(np.asarray(lngs, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+def read_pointer(directory=TRAVEL_MATRIX_DIR):
+    try:
+        with open(os.path.join(directory, POINTER_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def build_travel_matrix(db, directory=TRAVEL_MATRIX_DIR, force=False):
+    """
+    전체 장소 쌍의 거리(km) / 이동 시간(분) / 도보 여부 행렬을 .npy 로 저장 (도로망이 있으면 도로 기준)
+    카탈로그(id, 좌표)가 그대로면 건너뜀 (force=True 면 항상 다시)
+    return: (행렬을 새로 만들었는지, 장소 수)
+    """
+    rows = db.execute(
+        select(Place.id, Place.latitude, Place.longitude)
+        .where(Place.latitude.isnot(None), Place.longitude.isnot(None))
+        .order_by(Place.id)
+    ).all()
+    ids = np.asarray([r[0] for r in rows], dtype=np.int64)
+    lats = [r[1] for r in rows]
+    lngs = [r[2] for r in rows]
+
+    fingerprint = catalog_fingerprint(ids, lats, lngs)
+    pointer = read_pointer(directory)
+    if not force and pointer is not None and pointer.get("fingerprint") == fingerprint:
+        return False, len(ids)
+
+    distance_km, duration_min, walk = compute_legs(lats, lngs, lats, lngs)
+    arrays = {
+        "ids": ids,
+        "distance_km": distance_km.astype(np.float32),
+        "duration_min": duration_min.astype(np.float32),
+        "walk": walk.astype(np.uint8),
+    }
+
+    os.makedirs(directory, exist_ok=True)
+    version = f"{int(time.time() * 1000)}_{fingerprint}"
+    for name, array in arrays.items():
+        np.save(_array_path(directory, version, name), array)
+
+    # 포인터를 원자적으로 교체 (임시 파일에 쓰고 os.replace)
+    tmp_path = os.path.join(directory, POINTER_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": version, "fingerprint": fingerprint, "count": len(ids)}, f)
+    os.replace(tmp_path, os.path.join(directory, POINTER_FILE))
+
+    # 예전 버전 파일 정리 (이미 mmap 으로 열어둔 워커는 다시 읽기 전까지 계속 쓸 수 있음)
+    for filename in os.listdir(directory):
+        if filename.endswith(".npy") and not filename.startswith(version):
+            os.remove(os.path.join(directory, filename))
+    return True, len(ids)
+
+class TravelMatrix:
+    """
+    장소 id 로 미리 계산한 구간 거리/시간을 꺼내 쓰는 읽기 전용 행렬 (mmap)
+    """
+    def __init__(self, directory=TRAVEL_MATRIX_DIR, check_seconds=TRAVEL_MATRIX_CHECK_SECONDS):
+        self.directory = directory
+        self.check_seconds = check_seconds
+        self._state = None          # (version, ids, {이름: 행렬})
+        self._checked_at = None     # 마지막으로 포인터 파일을 확인한 시각
+        self._lock = threading.Lock()
+
+    def _load(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return self._state
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_seconds:
+                return self._state
+            self._checked_at = now
+            pointer = read_pointer(self.directory)
+            if pointer is None:
+                self._state = None
+            elif self._state is None or self._state[0] != pointer["version"]:
+                try:
+                    version = pointer["version"]
+                    arrays = {
+                        name: np.load(_array_path(self.directory, version, name), mmap_mode="r")
+                        for name in ARRAYS
+                    }
+                    self._state = (version, np.asarray(arrays.pop("ids")), arrays)
+                    print(f"🧭 이동 행렬 로딩: 장소 {len(self._state[1])}곳 ({version})")
+                except FileNotFoundError:
+                    # 다른 프로세스가 막 새 버전으로 바꾸는 중 -> 다음 호출 때 다시
+                    self._checked_at = None
+        return self._state
+
+    def legs(self, place_ids, kinds=("distance_km", "duration_min", "walk")):
+        """
+        place_ids 사이 구간 행렬들 [n, n] (float64, kinds 순서대로: distance_km / duration_min / walk)
+        모두 같은 버전(한 번 읽은 상태)에서 꺼냄 -> 중간에 새 버전으로 바뀌어도 한 경로 안에서 섞이지 않음
+        행렬에 없는 장소(id 없음 / 카탈로그 밖)가 낀 칸은 NaN -> 호출한 쪽에서 실시간 계산
+        행렬 자체가 없으면 None
+        """
+        state = self._load()
+        if state is None:
+            return None
+        _, ids, arrays = state
+        if len(ids) == 0:
+            return None
+
+        query = np.asarray([-1 if place_id is None else place_id for place_id in place_ids], dtype=np.int64)
+        positions = np.clip(np.searchsorted(ids, query), 0, len(ids) - 1)
+        known = ids[positions] == query
+        rows = np.flatnonzero(known)
+
+        results = []
+        for kind in kinds:
+            result = np.full((len(query), len(query)), np.nan)
+            if len(rows):
+                result[np.ix_(rows, rows)] = arrays[kind][np.ix_(positions[rows], positions[rows])]
+            results.append(result)
+        return results
+
+    def stats(self):
+        state = self._state
+        return {
+            "version": state[0] if state else None,
+            "places": int(len(state[1])) if state else 0,
+        }
+
+# 서비스 인스턴스 생성
+travel_matrix = TravelMatrix()
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
@@ -17,6 +18,11 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return R * c
 
+# 이동 수단 기준 (1km 미만은 걷기, 이상은 차량)
+WALK_MAX_KM = 1.0
+WALK_SPEED_KMH = 4
+DRIVE_SPEED_KMH = 30
+
 def calculate_duration(distance_km):
     """
     거리에 따라 이동 수단을 판단하고 시간 계산
@@ -26,11 +32,11 @@ def calculate_duration(distance_km):
     if distance_km <= 0:
         return {"min": 0, "type": "도보"}
 
-    if distance_km < 1.0:
-        speed = 4  # 시속 4km (걷기)
+    if distance_km < WALK_MAX_KM:
+        speed = WALK_SPEED_KMH  # 시속 4km (걷기)
         move_type = "도보"
     else:
-        speed = 30 # 시속 30km (차량)
+        speed = DRIVE_SPEED_KMH # 시속 30km (차량)
         move_type = "차량"
 
     hours = distance_km / speed
@@ -38,37 +44,43 @@ def calculate_duration(distance_km):
     
     return {"min": minutes, "type": move_type}
 
-def sort_by_shortest_path(start_lat, start_lng, places):
+def calculate_durations(distances_km):
     """
-    현재 위치에서 출발해서 가장 빨리 갈 수 있는 순서로 정렬 (Greedy)
+    calculate_duration 의 numpy 버전 (반올림 전 분 단위 배열, 거리 행렬 통째로)
     """
-    sorted_places = []
-    current_lat = start_lat
-    current_lng = start_lng
-    
-    # 원본 리스트 복사
-    remaining_places = places.copy()
+    distances = np.asarray(distances_km)
+    speed = np.where(distances < WALK_MAX_KM, WALK_SPEED_KMH, DRIVE_SPEED_KMH)
+    return np.maximum(distances, 0) / speed * 60
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(lat, lng, precision=6):
+    """
+    좌표를 geohash 문자열로 변환 (같은 칸이면 같은 문자열)
+    precision 6 = 대략 1.2km x 0.6km 칸
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # 경도 비트부터 번갈아 가며
+
+    while len(chars) < precision:
+        value_range, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits = bits << 1
+            value_range[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
 
-    while remaining_places:
-        # 1. 현재 위치에서 가장 가까운 곳 찾기
-        nearest_place = min(
-            remaining_places, 
-            key=lambda p: calculate_distance(current_lat, current_lng, p['lat'], p['lng'])
-        )
-        
-        # 2. 이동 시간 및 타입 계산해서 데이터에 추가
-        dist = calculate_distance(current_lat, current_lng, nearest_place['lat'], nearest_place['lng'])
-        time_info = calculate_duration(dist) 
-        
-        nearest_place['duration'] = time_info['min']     # 예: 15 (분)
-        nearest_place['transport'] = time_info['type']   # 예: "차량"
-        
-        # 3. 결과 리스트에 넣고, 남은 목록에서 삭제
-        sorted_places.append(nearest_place)
-        remaining_places.remove(nearest_place)
-        
-        # 4. 다음 출발지를 여기로 업데이트
-        current_lat = nearest_place['lat']
-        current_lng = nearest_place['lng']
-        
-    return sorted_places
\ No newline at end of file
+    return "".join(chars)
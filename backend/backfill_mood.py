@@ -0,0 +1,60 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Place, PlaceImage
+from app.db.embedding_storage import EMBEDDING_PCA_DIM
+from app.db.mood_column import ensure_mood_column
+from app.db.catalog_version import ensure_catalog_version
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def backfill_moods(only_missing=True):
+    """
+    저장된 임베딩으로 장소별 무드 태그를 계산해서 채워넣기
+    only_missing=False면 전부 다시 계산 (무드 프롬프트를 바꿨을 때)
+    """
+    if EMBEDDING_PCA_DIM:
+        # 텍스트 임베딩은 512차원이라 PCA 로 줄여 저장한 벡터와는 비교할 수 없음
+        print("❌ PCA 로 줄인 임베딩으로는 무드를 다시 계산할 수 없어 (원본 벡터로 다시 시딩해줘)")
+        return
+
+    # 모델 로딩이 오래 걸려서 실제로 돌릴 때만 가져옴
+    from app.services.recommend_service import recommend_service
+
+    engine = create_engine(DATABASE_URL)
+    ensure_mood_column(engine)
+    ensure_catalog_version(engine)
+    db = sessionmaker(bind=engine)()
+
+    try:
+        # 장소(centroid)와 사진별 임베딩 둘 다 채움
+        for model in (Place, PlaceImage):
+            stmt = select(model)
+            if only_missing:
+                stmt = stmt.where(model.mood.is_(None))
+            rows = db.scalars(stmt).all()
+            print(f"📋 {model.__tablename__} 무드 계산 대상: {len(rows)}개")
+
+            for row in rows:
+                if row.embedding is None: continue
+                row.mood = recommend_service.analyze_mood(row.embedding)
+                print(f"  🏷️ {row} -> {row.mood}")
+
+        db.commit()
+        print("✅ 무드 백필 완료!")
+    except Exception as e:
+        print(f"❌ 에러: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # --all 을 붙이면 이미 채워진 무드도 다시 계산
+    backfill_moods(only_missing="--all" not in sys.argv)
@@ -0,0 +1,90 @@
+import os
+import sys
+import io
+import time
+import multiprocessing
+
+sys.path.append(os.getcwd())
+
+from PIL import Image
+from app.services.image_decode import decode_image
+
+IMAGE_FOLDER = "images"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+REPEAT = 3
+
+def legacy_decode(image_bytes):
+    # 기존 방식: 원본 해상도 그대로 전부 디코딩
+    return Image.open(io.BytesIO(image_bytes)).convert("RGB")
+
+def make_phone_photo(megapixels):
+    # 폰 카메라 크기(4:3) 가짜 JPEG 만들기
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    image = Image.radial_gradient("L").resize((width, height)).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return f"synthetic_{megapixels}MP.jpg", buffer.getvalue()
+
+def load_samples():
+    samples = []
+    for filename in sorted(os.listdir(IMAGE_FOLDER)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS): continue
+        with open(os.path.join(IMAGE_FOLDER, filename), "rb") as f:
+            samples.append((filename, f.read()))
+    for megapixels in (12, 48):
+        samples.append(make_phone_photo(megapixels))
+    return samples
+
+def read_status_kb(field):
+    # /proc/self/status 의 VmRSS(현재) / VmHWM(최고) 값 (KB, 리눅스 전용)
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise RuntimeError(f"/proc/self/status 에 {field} 없음")
+
+def peak_rss_growth(decode_fn, image_bytes):
+    # 디코딩 한 번 동안 RSS 가 디코딩 전보다 최대 얼마나 늘었는지 (MB)
+    # Pillow 픽셀 버퍼는 파이썬 할당자를 안 거쳐서 tracemalloc 에 안 잡힘 -> 최고 RSS 를 현재값으로 되돌리고 잼
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = read_status_kb("VmRSS")
+    image = decode_fn(image_bytes)
+    peak = read_status_kb("VmHWM")
+    return (peak - before) / 1024, image.size
+
+def measure(decode_fn, image_bytes):
+    # 시간은 REPEAT번 중 최솟값, 메모리는 실측 최대 RSS 증가량
+    # 메모리는 새 프로세스에서 잼 (앞 디코딩이 풀어둔 힙이 남아 있으면 증가량이 작게 나옴)
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        decode_fn(image_bytes)
+        best = min(best, time.perf_counter() - started)
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        peak_mb, size = pool.apply(peak_rss_growth, (decode_fn, image_bytes))
+    return best * 1000, peak_mb, size
+
+def run_benchmark():
+    samples = load_samples()
+    total_legacy = total_fast = 0.0
+    peak_legacy = peak_fast = 0.0
+
+    print("\n" + "=" * 92)
+    print(f"{'file':<32}{'legacy ms':>10}{'fast ms':>10}{'legacy RSS':>11}{'fast RSS':>10}  {'decoded size':>16}")
+    print("=" * 92)
+    for filename, image_bytes in samples:
+        legacy_ms, legacy_mb, _ = measure(legacy_decode, image_bytes)
+        fast_ms, fast_mb, fast_size = measure(decode_image, image_bytes)
+        total_legacy += legacy_ms
+        total_fast += fast_ms
+        peak_legacy = max(peak_legacy, legacy_mb)
+        peak_fast = max(peak_fast, fast_mb)
+        print(f"{filename[:31]:<32}{legacy_ms:>10.1f}{fast_ms:>10.1f}{legacy_mb:>11.1f}{fast_mb:>10.2f}  {str(fast_size):>16}")
+    print("=" * 92)
+    print(f"총 디코딩 시간: {total_legacy:.0f}ms -> {total_fast:.0f}ms ({total_legacy / max(total_fast, 1e-9):.1f}배)")
+    print(f"디코딩 1장 최대 RSS 증가: {peak_legacy:.1f}MB -> {peak_fast:.2f}MB\n")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Base
+from app.services.place_neighbors import update_place_neighbors, verify_place_neighbors, PLACE_NEIGHBORS_K
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="장소별 비슷한 장소 top-k (place_neighbors) 계산")
+    parser.add_argument("--k", type=int, default=PLACE_NEIGHBORS_K, help="장소마다 저장할 이웃 수")
+    parser.add_argument("--full", action="store_true", help="바뀐 장소만이 아니라 전부 다시 계산")
+    parser.add_argument("--verify", action="store_true", help="갱신 후 전체 재계산 결과와 같은지 확인")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    try:
+        started = time.perf_counter()
+        updated = update_place_neighbors(db, k=args.k, full=args.full)
+        db.commit()
+        print(f"✅ 장소 {updated}곳의 비슷한 장소 목록 갱신 ({time.perf_counter() - started:.2f}초)")
+
+        if args.verify:
+            mismatched = verify_place_neighbors(db, k=args.k)
+            if mismatched:
+                print(f"⚠️ 전체 재계산과 다른 장소 {len(mismatched)}곳 (예: {mismatched[:10]}) -> --full 로 다시 계산해줘")
+                sys.exit(1)
+            print("🔍 전체 재계산 결과와 일치!")
+    except Exception as e:
+        print(f"❌ 에러: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
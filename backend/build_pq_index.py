@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Place, PlaceImage
+from app.services.pq_index import IVFPQIndex, PQ_INDEX_PATH, PQ_NPROBE, PQ_RERANK
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def load_catalog(db):
+    # 장소 centroid 임베딩 (검색 대상)
+    rows = db.execute(select(Place.id, Place.embedding, Place.mood).where(Place.embedding.isnot(None))).all()
+    ids = np.asarray([r[0] for r in rows], dtype=np.int64)
+    vectors = np.asarray([r[1] for r in rows], dtype=np.float32)
+    moods = [r[2] for r in rows]
+    return ids, vectors, moods
+
+def load_queries(db, limit):
+    # 실제 사진 임베딩을 쿼리로 사용 (업로드 사진과 가장 비슷한 분포)
+    rows = db.execute(select(PlaceImage.embedding).where(PlaceImage.embedding.isnot(None)).limit(limit)).all()
+    return np.asarray([r[0] for r in rows], dtype=np.float32)
+
+def report(index, ids, vectors, queries, k=10):
+    """
+    정확한 전수 검색 대비 recall@k 와 쿼리당 지연시간
+    """
+    catalog = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+    started = time.perf_counter()
+    exact = np.argsort(-(normalized @ catalog.T), axis=1)[:, :k]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    print("\n" + "=" * 72)
+    print(f"{'nprobe':>8}{'rerank':>8}{'recall@' + str(k):>12}{'pq ms/q':>12}{'exact ms/q':>12}")
+    print("=" * 72)
+    positions = {place_id: i for i, place_id in enumerate(ids.tolist())}
+    for nprobe in sorted({1, 4, PQ_NPROBE, 16, 32}):
+        for rerank in sorted({k, PQ_RERANK}):
+            started = time.perf_counter()
+            candidates = index.search(queries, k=rerank, nprobe=nprobe)
+            # 후보만 원본 벡터로 재정렬
+            found = []
+            for q, hits in zip(normalized, candidates):
+                rows = np.asarray([positions[place_id] for place_id, _ in hits], dtype=np.int64)
+                if len(rows) == 0:
+                    found.append(set())
+                    continue
+                top = rows[np.argsort(-(catalog[rows] @ q))[:k]]
+                found.append(set(top.tolist()))
+            pq_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+            recall = np.mean([len(f & set(e.tolist())) / k for f, e in zip(found, exact)])
+            print(f"{nprobe:>8}{rerank:>8}{recall:>12.4f}{pq_ms:>12.3f}{exact_ms:>12.3f}")
+    print("=" * 72)
+
+    original_mb = vectors.nbytes / (1024 * 1024)
+    compressed_mb = (index.codes.nbytes + index.ids.nbytes) / (1024 * 1024)
+    print(f"저장 크기: 원본 fp32 {original_mb:.2f}MB -> PQ 코드 {compressed_mb:.2f}MB\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="장소 임베딩 IVF-PQ 압축 인덱스 생성 + recall/지연시간 리포트")
+    parser.add_argument("--nlist", type=int, default=256, help="coarse 클러스터 수 (대략 sqrt(N)의 4~16배)")
+    parser.add_argument("--m", type=int, default=64, help="PQ 부분공간 수 (벡터당 바이트 수)")
+    parser.add_argument("--no-opq", action="store_true", help="OPQ 회전 학습 생략")
+    parser.add_argument("--queries", type=int, default=500, help="리포트에 쓸 쿼리 수")
+    parser.add_argument("--output", default=PQ_INDEX_PATH or "models/place_pq_index.npz")
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    db = sessionmaker(bind=engine)()
+    index_ids, vectors, moods = load_catalog(db)
+    queries = load_queries(db, args.queries)
+    db.close()
+    print(f"📋 장소 임베딩 {len(index_ids)}개, 리포트 쿼리 {len(queries)}개")
+
+    started = time.perf_counter()
+    index = IVFPQIndex(nlist=args.nlist, m=args.m, opq=not args.no_opq)
+    index.train(vectors)
+    index.add(index_ids, vectors, moods)
+    index.save(args.output)
+    print(f"✅ 인덱스 저장 완료: {args.output} ({time.perf_counter() - started:.1f}초)")
+
+    if len(queries):
+        report(index, index_ids, vectors, queries)
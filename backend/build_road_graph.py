@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import bz2
+import gzip
+import time
+import argparse
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from app.geo import EARTH_RADIUS_KM
+from app.services.road_router import ROAD_GRAPH_PATH, PROFILES
+from app.utils import WALK_SPEED_KMH
+
+# 차량 프로필: 도로 종류별 평균 속도 (km/h, 신호/정체를 감안해 제한속도보다 낮게)
+DRIVE_SPEEDS = {
+    "motorway": 80, "motorway_link": 50,
+    "trunk": 60, "trunk_link": 40,
+    "primary": 40, "primary_link": 30,
+    "secondary": 35, "secondary_link": 30,
+    "tertiary": 30, "tertiary_link": 25,
+    "unclassified": 25, "residential": 20,
+    "living_street": 10, "service": 15,
+}
+# 걷기 프로필: 사람이 다닐 수 있는 도로 (자동차 전용도로 제외)
+WALK_HIGHWAYS = {
+    "primary", "primary_link", "secondary", "secondary_link", "tertiary", "tertiary_link",
+    "unclassified", "residential", "living_street", "service", "pedestrian", "footway",
+    "path", "steps", "track", "cycleway", "corridor", "bridleway",
+}
+NO_ACCESS = {"no", "private"}
+
+def open_osm(path):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+def parse_maxspeed(value):
+    """
+    "50", "50 km/h", "30 mph" -> km/h (못 읽으면 None)
+    """
+    match = re.match(r"^\s*(\d+(?:\.\d+)?)\s*(mph)?", value or "")
+    if not match:
+        return None
+    speed = float(match.group(1))
+    return speed * 1.609 if match.group(2) else speed
+
+def way_profiles(tags):
+    """
+    OSM way 태그 -> {프로필: (정방향 가능, 역방향 가능, 속도 km/h)}
+    """
+    highway = tags.get("highway")
+    access = tags.get("access")
+    profiles = {}
+
+    foot = tags.get("foot")
+    if highway in WALK_HIGHWAYS and foot not in NO_ACCESS and (access not in NO_ACCESS or foot == "yes"):
+        profiles["walk"] = (True, True, WALK_SPEED_KMH)
+
+    motor = tags.get("motor_vehicle", tags.get("motorcar"))
+    if highway in DRIVE_SPEEDS and access not in NO_ACCESS and motor not in NO_ACCESS:
+        speed = DRIVE_SPEEDS[highway]
+        maxspeed = parse_maxspeed(tags.get("maxspeed"))
+        if maxspeed:
+            speed = min(speed, maxspeed)
+        oneway = tags.get("oneway")
+        if oneway in ("yes", "1", "true") or tags.get("junction") in ("roundabout", "circular") or (
+                highway == "motorway" and oneway != "no"):
+            profiles["drive"] = (True, False, speed)
+        elif oneway == "-1":
+            profiles["drive"] = (False, True, speed)
+        else:
+            profiles["drive"] = (True, True, speed)
+    return profiles
+
+def read_ways(path):
+    """
+    1차 읽기: 도로(highway) way 들의 노드 목록 + 프로필
+    """
+    ways = []
+    with open_osm(path) as f:
+        for _, element in ET.iterparse(f, events=("end",)):
+            if element.tag == "way":
+                tags = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+                profiles = way_profiles(tags)
+                if profiles:
+                    refs = [int(nd.get("ref")) for nd in element.iter("nd")]
+                    if len(refs) >= 2:
+                        ways.append((refs, profiles))
+                element.clear()
+            elif element.tag in ("node", "relation"):
+                element.clear()
+    return ways
+
+def read_nodes(path, needed):
+    """
+    2차 읽기: 도로에 쓰인 노드 좌표만
+    """
+    coords = {}
+    with open_osm(path) as f:
+        for _, element in ET.iterparse(f, events=("end",)):
+            if element.tag == "node":
+                node_id = int(element.get("id"))
+                if node_id in needed:
+                    coords[node_id] = (float(element.get("lat")), float(element.get("lon")))
+            if element.tag in ("node", "way", "relation"):
+                element.clear()
+    return coords
+
+def read_pbf(path):
+    """
+    .osm.pbf 는 pyosmium 이 있을 때만 (pip install osmium)
+    """
+    try:
+        import osmium
+    except ImportError:
+        raise SystemExit("❌ .pbf 를 읽으려면 pyosmium 이 필요해 (pip install osmium) - 아니면 .osm(.bz2) 추출본을 써줘")
+
+    class Handler(osmium.SimpleHandler):
+        def __init__(self):
+            super().__init__()
+            self.ways = []
+            self.coords = {}
+
+        def way(self, way):
+            profiles = way_profiles({tag.k: tag.v for tag in way.tags})
+            if profiles and len(way.nodes) >= 2:
+                refs = [node.ref for node in way.nodes]
+                self.ways.append((refs, profiles))
+                for node in way.nodes:
+                    if node.location.valid():
+                        self.coords[node.ref] = (node.location.lat, node.location.lon)
+
+    handler = Handler()
+    handler.apply_file(path, locations=True)
+    return handler.ways, handler.coords
+
+def segment_lengths(lats, lngs):
+    """
+    연속한 좌표 사이 거리 (m)
+    """
+    lat = np.radians(lats)
+    lng = np.radians(lngs)
+    a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * 1000 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def simplify(ways, coords):
+    """
+    교차점(두 개 이상 way 가 공유하거나 way 끝인 노드)만 남기고 그 사이 노드들은 구간 길이로 합침
+    return: 교차점 OSM id 목록, [(u, v, 미터, 프로필들)] (u, v 는 교차점 번호)
+    """
+    usage = {}
+    for refs, _ in ways:
+        for ref in refs:
+            usage[ref] = usage.get(ref, 0) + 1
+
+    junction_index = {}
+    def junction(ref):
+        if ref not in junction_index:
+            junction_index[ref] = len(junction_index)
+        return junction_index[ref]
+
+    edges = []
+    for refs, profiles in ways:
+        refs = [ref for ref in refs if ref in coords]
+        if len(refs) < 2:
+            continue
+        points = np.asarray([coords[ref] for ref in refs])
+        lengths = segment_lengths(points[:, 0], points[:, 1])
+        start = 0
+        for k in range(1, len(refs)):
+            if k == len(refs) - 1 or usage[refs[k]] > 1:
+                if refs[start] != refs[k]:
+                    edges.append((junction(refs[start]), junction(refs[k]), float(lengths[start:k].sum()), profiles))
+                start = k
+    ids = sorted(junction_index, key=junction_index.get)
+    return ids, edges
+
+def largest_component(count, u, v):
+    """
+    (방향 무시) 가장 큰 연결 요소에 속한 노드 번호들 - union-find
+    """
+    parent = list(range(count))
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    for a, b in zip(u.tolist(), v.tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+    used = np.unique(np.concatenate([u, v]))
+    roots = np.asarray([find(x) for x in used.tolist()])
+    if len(roots) == 0:
+        return used
+    values, counts = np.unique(roots, return_counts=True)
+    return used[roots == values[counts.argmax()]]
+
+def to_csr(count, u, v, seconds, meters):
+    order = np.argsort(u, kind="stable")
+    indptr = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(u, minlength=count), out=indptr[1:])
+    return indptr, v[order].astype(np.int32), seconds[order].astype(np.float32), meters[order].astype(np.float32)
+
+def build_graph(ways, coords):
+    ids, edges = simplify(ways, coords)
+    count = len(ids)
+    arrays = {
+        "node_lat": np.asarray([coords[i][0] for i in ids], dtype=np.float64),
+        "node_lng": np.asarray([coords[i][1] for i in ids], dtype=np.float64),
+    }
+    for profile in PROFILES:
+        u, v, seconds, meters = [], [], [], []
+        for a, b, length, profiles in edges:
+            if profile not in profiles:
+                continue
+            forward, backward, speed = profiles[profile]
+            travel = length / (speed * 1000 / 3600)
+            if forward:
+                u.append(a); v.append(b); seconds.append(travel); meters.append(length)
+            if backward:
+                u.append(b); v.append(a); seconds.append(travel); meters.append(length)
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        seconds = np.asarray(seconds, dtype=np.float64)
+        meters = np.asarray(meters, dtype=np.float64)
+
+        for prefix, (src, dst) in ((profile, (u, v)), (f"{profile}_rev", (v, u))):
+            indptr, indices, sec, met = to_csr(count, src, dst, seconds, meters)
+            arrays[f"{prefix}_indptr"] = indptr
+            arrays[f"{prefix}_indices"] = indices
+            arrays[f"{prefix}_seconds"] = sec
+            arrays[f"{prefix}_meters"] = met
+        arrays[f"{profile}_snap"] = largest_component(count, u, v).astype(np.int64)
+        print(f"  🛣️ {profile}: 간선 {len(u)}개, 스냅 노드 {len(arrays[f'{profile}_snap'])}개")
+    return arrays
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OSM 추출본(대전)으로 걷기/차량 도로망(CSR) 생성")
+    parser.add_argument("osm", help=".osm / .osm.bz2 / .osm.gz (pyosmium 이 있으면 .osm.pbf 도)")
+    parser.add_argument("--output", default=ROAD_GRAPH_PATH or "models/road_graph.npz")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.osm.endswith(".pbf"):
+        ways, coords = read_pbf(args.osm)
+    else:
+        print("📖 1차: 도로 way 읽는 중...")
+        ways = read_ways(args.osm)
+        print("📖 2차: 노드 좌표 읽는 중...")
+        coords = read_nodes(args.osm, {ref for refs, _ in ways for ref in refs})
+    print(f"✅ 도로 {len(ways)}개, 노드 {len(coords)}개 ({time.perf_counter() - started:.1f}초)")
+
+    arrays = build_graph(ways, coords)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    np.savez(args.output, **arrays)
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    print(f"💾 교차점 {len(arrays['node_lat'])}개 도로망 저장: {args.output} ({size_mb:.1f}MB)")
+    print("🔁 이동 행렬도 다시 만들어줘: python build_travel_matrix.py")
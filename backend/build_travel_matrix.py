@@ -0,0 +1,34 @@
+import os
+import sys
+import time
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.services.travel_matrix import build_travel_matrix, TRAVEL_MATRIX_DIR
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="카탈로그 장소 쌍 이동 거리/시간 행렬 생성 (장소가 바뀌었을 때만)")
+    parser.add_argument("--force", action="store_true", help="카탈로그가 그대로여도 다시 생성")
+    parser.add_argument("--output", default=TRAVEL_MATRIX_DIR)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    db = sessionmaker(bind=engine)()
+    try:
+        started = time.perf_counter()
+        rebuilt, count = build_travel_matrix(db, args.output, force=args.force)
+        if rebuilt:
+            size_mb = count * count * 4 * 2 / (1024 * 1024)
+            print(f"✅ 장소 {count}곳 이동 행렬 생성 ({size_mb:.2f}MB, {time.perf_counter() - started:.2f}초) -> {args.output}")
+        else:
+            print(f"💤 카탈로그가 그대로라 건너뜀 (장소 {count}곳)")
+    finally:
+        db.close()
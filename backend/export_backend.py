@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+
+sys.path.append(os.getcwd())
+
+import torch
+from PIL import Image
+from transformers import CLIPModel, CLIPProcessor
+
+from app.services.ai_service import MODEL_NAME
+from app.services.inference_backends import VisionEncoder, EagerBackend, CompiledBackend, OnnxBackend, ONNX_MODEL_PATH
+
+IMAGE_FOLDER = "images"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+MIN_COSINE = 0.99  # fp32 대비 이 값보다 낮으면 경고
+
+def export_onnx(encoder, processor, output_path):
+    """
+    비전 타워를 fp32 ONNX로 뽑고, int8 동적 양자화 버전을 output_path에 저장
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    fp32_path = output_path.replace(".onnx", "_fp32.onnx")
+
+    # 1. 더미 입력으로 그래프 추출 (배치 크기는 가변)
+    dummy = processor(images=Image.new("RGB", (224, 224)), return_tensors="pt")["pixel_values"]
+    print(f"📦 ONNX export 중... -> {fp32_path}")
+    torch.onnx.export(
+        encoder,
+        (dummy,),
+        fp32_path,
+        input_names=["pixel_values"],
+        output_names=["image_embeds"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=17,
+    )
+
+    # 2. 가중치 int8 동적 양자화
+    print(f"🗜️ int8 동적 양자화 중... -> {output_path}")
+    quantize_dynamic(fp32_path, output_path, weight_type=QuantType.QInt8)
+    print("✅ export 완료!")
+
+def load_seed_pixels(processor):
+    images = []
+    for filename in sorted(os.listdir(IMAGE_FOLDER)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS): continue
+        with Image.open(os.path.join(IMAGE_FOLDER, filename)) as image:
+            images.append(image.convert("RGB"))
+    print(f"🖼️ 검증용 시드 이미지 {len(images)}장")
+    return processor(images=images, return_tensors="pt")["pixel_values"]
+
+def verify_backends(encoder, processor, onnx_path):
+    """
+    시드 이미지로 각 백엔드가 fp32 eager와 얼마나 같은 벡터를 내는지 (코사인) 확인
+    """
+    pixel_values = load_seed_pixels(processor)
+
+    reference_backend = EagerBackend(encoder)
+    reference = reference_backend.encode(pixel_values)
+    reference = reference / reference.norm(dim=-1, keepdim=True)
+
+    backends = [reference_backend, CompiledBackend(encoder)]
+    if os.path.exists(onnx_path):
+        backends.append(OnnxBackend(onnx_path))
+    else:
+        print(f"⚠️ ONNX 파일이 없어서 onnx 백엔드는 건너뜀: {onnx_path}")
+
+    print("\n" + "=" * 60)
+    print(f"{'backend':<10}{'min cos':>10}{'mean cos':>10}{'ms/img':>10}  판정")
+    print("=" * 60)
+    for backend in backends:
+        backend.encode(pixel_values[:1])  # 첫 실행(컴파일/할당) 비용 제외
+
+        started = time.perf_counter()
+        features = backend.encode(pixel_values)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / len(pixel_values)
+
+        features = features / features.norm(dim=-1, keepdim=True)
+        cosine = (features * reference).sum(dim=-1)
+        verdict = "✅" if cosine.min().item() >= MIN_COSINE else "❌"
+        print(f"{backend.name:<10}{cosine.min().item():>10.4f}{cosine.mean().item():>10.4f}{elapsed_ms:>10.1f}  {verdict}")
+    print("=" * 60 + "\n")
+
+if __name__ == "__main__":
+    # 사용법: python export_backend.py [export|verify|all]
+    command = sys.argv[1] if len(sys.argv) > 1 else "all"
+
+    model = CLIPModel.from_pretrained(MODEL_NAME)
+    processor = CLIPProcessor.from_pretrained(MODEL_NAME)
+    encoder = VisionEncoder(model.vision_model, model.visual_projection).eval()
+
+    if command in ("export", "all"):
+        export_onnx(encoder, processor, ONNX_MODEL_PATH)
+    if command in ("verify", "all"):
+        verify_backends(encoder, processor, ONNX_MODEL_PATH)
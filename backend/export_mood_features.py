@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+# 텍스트 임베딩은 텍스트 타워가 있어야 뽑을 수 있으므로 full 모드 / fp32로 고정
+os.environ["MODEL_LOAD_MODE"] = "full"
+os.environ["MODEL_DTYPE"] = "float32"
+
+import torch
+from app.services.ai_service import ai_instance
+from app.services.recommend_service import recommend_service, MOOD_FEATURES_PATH
+
+def export_mood_features():
+    """
+    무드 프롬프트 텍스트 임베딩을 파일로 저장 (비전 전용 모드에서 사용)
+    """
+    prompts = list(recommend_service.label_map.keys())
+    features = recommend_service._get_text_features()
+
+    os.makedirs(os.path.dirname(MOOD_FEATURES_PATH) or ".", exist_ok=True)
+    torch.save({
+        "model": ai_instance.model_name,
+        "prompts": prompts,
+        "features": features.clone(),
+    }, MOOD_FEATURES_PATH)
+    print(f"✅ 무드 텍스트 임베딩 저장 완료: {MOOD_FEATURES_PATH} {tuple(features.shape)}")
+
+if __name__ == "__main__":
+    export_mood_features()
@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import subprocess
+
+sys.path.append(os.getcwd())
+
+# 비교할 로딩 설정들 (MODEL_LOAD_MODE, MODEL_DTYPE)
+CONFIGS = [
+    ("full", "float32"),
+    ("vision", "float32"),
+    ("vision", "bfloat16"),
+]
+
+def rss_mb():
+    # 현재 프로세스의 상주 메모리 (리눅스 /proc 기준)
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def measure():
+    """
+    (자식 프로세스에서 실행) 모델 로딩 전/후 + 추론 한 번 후의 메모리 측정
+    """
+    before = rss_mb()
+    from app.services.ai_service import get_ai_service
+    from app.services.recommend_service import recommend_service
+    ai_instance = get_ai_service()
+    loaded = rss_mb()
+
+    with open(os.path.join("images", "01sungsim1.jpeg"), "rb") as f:
+        vector = ai_instance.image_to_vector(f.read())
+    recommend_service.analyze_mood(vector)
+    after_inference = rss_mb()
+
+    print(json.dumps({"before": before, "loaded": loaded, "after_inference": after_inference}))
+
+def report():
+    print("\n" + "=" * 64)
+    print(f"{'mode':<8}{'dtype':<10}{'before':>10}{'loaded':>10}{'infer':>10}{'model':>10}  (MB)")
+    print("=" * 64)
+    for load_mode, dtype in CONFIGS:
+        env = dict(os.environ, MODEL_LOAD_MODE=load_mode, MODEL_DTYPE=dtype)
+        result = subprocess.run(
+            [sys.executable, __file__, "--measure"],
+            env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"{load_mode:<8}{dtype:<10}  ❌ 실패: {result.stderr.strip().splitlines()[-1]}")
+            continue
+        m = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{load_mode:<8}{dtype:<10}{m['before']:>10.0f}{m['loaded']:>10.0f}{m['after_inference']:>10.0f}"
+              f"{m['loaded'] - m['before']:>10.0f}")
+    print("=" * 64 + "\n")
+
+if __name__ == "__main__":
+    # vision 모드 측정 전에 python export_mood_features.py 로 텍스트 임베딩 파일을 만들어두세요
+    if "--measure" in sys.argv:
+        measure()
+    else:
+        report()
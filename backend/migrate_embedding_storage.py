@@ -0,0 +1,237 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+import numpy as np
+from sqlalchemy import create_engine, text, bindparam
+from app.db.embedding_storage import EMBEDDING_STORAGE, EMBEDDING_PCA_DIM, EMBEDDING_DIM, CLIP_DIM, embedding_type
+from app.db.vector_index import VECTOR_TABLES, rebuild_vector_index, _index_name
+from app.db.catalog_version import ensure_catalog_version
+from app.services.embedding_projection import EmbeddingProjection, fit_projection, EMBEDDING_PCA_PATH
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# 변환 전 512차원 원본 임베딩 백업 (PCA 로 줄이면 DB에서는 원본이 사라짐)
+# 한 번 만든 백업은 다시 쓰지 않고, 나중에 추가된 행은 {이름}_{시각}.npz 로 따로 저장
+BACKUP_PATH = os.getenv("EMBEDDING_BACKUP_PATH", "models/embedding_backup.npz")
+
+def load_table(conn, table_name):
+    rows = conn.execute(text(
+        f"SELECT id, embedding::text FROM {table_name} WHERE embedding IS NOT NULL ORDER BY id"
+    )).all()
+    ids = np.asarray([r[0] for r in rows], dtype=np.int64)
+    vectors = np.asarray([json.loads(r[1]) for r in rows], dtype=np.float32)
+    return ids, vectors
+
+def column_type(conn, table_name):
+    """
+    지금 DB에 있는 embedding 컬럼 타입 (예: "vector(512)", "halfvec(256)")
+    """
+    return conn.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = CAST(:table_name AS regclass) AND attname = 'embedding'"
+    ), {"table_name": table_name}).scalar()
+
+def backup_files():
+    """
+    원본 백업 파일들 (처음 백업이 맨 앞, 그 뒤 추가분은 만든 순서대로)
+    """
+    stem, _ = os.path.splitext(BACKUP_PATH)
+    extra = sorted(glob.glob(f"{glob.escape(stem)}_*.npz"))
+    return ([BACKUP_PATH] if os.path.exists(BACKUP_PATH) else []) + extra
+
+def load_backup():
+    """
+    테이블별 {id: 원본 벡터} - 같은 id 는 먼저 만든 백업 값을 씀 (원본에 가장 가까움)
+    """
+    backup = {table_name: {} for table_name in VECTOR_TABLES}
+    for path in backup_files():
+        with np.load(path) as data:
+            for table_name in VECTOR_TABLES:
+                for i, v in zip(data[f"{table_name}_ids"].tolist(), data[f"{table_name}_vectors"]):
+                    backup[table_name].setdefault(i, v)
+    return backup
+
+def load_originals(conn):
+    """
+    테이블별 (ids, 512차원 원본 벡터, 백업에 새로 추가할 id 들)
+    - 백업에 있는 id: 백업 값 (fp32 원본)
+    - 백업에 없는 id: 지금 DB 값이 512차원이면 그대로 (vector 면 원본, halfvec 면 fp16 으로 반올림된 값)
+    - 백업에도 없고 이미 PCA 로 줄어든 행은 원본을 되살릴 수 없어서 중단
+    지금 DB에 없는 id (지워진 행)는 버림
+    """
+    backup = load_backup()
+    originals = {}
+    for table_name in VECTOR_TABLES:
+        current_type = column_type(conn, table_name)
+        ids, vectors = load_table(conn, table_name)
+        saved = backup[table_name]
+
+        missing = [i for i in ids.tolist() if i not in saved]
+        if missing and vectors.shape[1] != CLIP_DIM:
+            raise RuntimeError(
+                f"{table_name} 의 {len(missing)}행(예: id {missing[:5]})은 이미 {current_type} 로 줄어 있는데 "
+                f"원본 백업에 없어 - 해당 장소를 다시 시딩하거나 {CLIP_DIM}차원으로 임베딩을 다시 계산해줘"
+            )
+        if missing and current_type != f"vector({CLIP_DIM})":
+            print(f"⚠️ {table_name} {len(missing)}행은 백업이 없어서 지금 DB 값({current_type})을 원본으로 씀")
+
+        merged = np.asarray([saved[i] if i in saved else v for i, v in zip(ids.tolist(), vectors)], dtype=np.float32)
+        originals[table_name] = (ids, merged.reshape(len(ids), CLIP_DIM), np.asarray(missing, dtype=np.int64))
+    return originals
+
+def save_backup(originals):
+    """
+    백업에 없던 행만 새 파일로 저장 (이미 있는 백업 파일은 절대 덮어쓰지 않음)
+    """
+    additions = {}
+    for table_name, (ids, vectors, missing) in originals.items():
+        keep = np.isin(ids, missing)
+        additions[f"{table_name}_ids"] = ids[keep]
+        additions[f"{table_name}_vectors"] = vectors[keep]
+    if not any(len(additions[f"{t}_ids"]) for t in VECTOR_TABLES):
+        return None
+
+    path = BACKUP_PATH
+    if os.path.exists(path):
+        stem, _ = os.path.splitext(BACKUP_PATH)
+        path = f"{stem}_{int(time.time() * 1000)}.npz"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, **additions)
+    return path
+
+def convert(vectors, projection, storage):
+    """
+    원본 -> 저장 형식 (PCA 투영 -> fp16 반올림까지 DB에 들어가는 값 그대로 흉내)
+    """
+    converted = projection.project(vectors) if projection is not None else vectors
+    if storage == "halfvec":
+        converted = converted.astype(np.float16).astype(np.float32)
+    return converted
+
+def _normalize(matrix):
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+def accuracy_report(place_vectors, converted_places, query_vectors, converted_queries, threshold, k=10):
+    """
+    시드 사진 임베딩을 쿼리로, 장소 centroid 검색 결과를 fp32 512차원과 비교
+    - top-1 일치율, recall@k, 상위 k개 코사인 거리 오차, 유사도 기준(threshold) 통과 여부가 바뀐 비율
+    """
+    k = min(k, len(place_vectors))
+    exact_dist = 1.0 - _normalize(query_vectors) @ _normalize(place_vectors).T
+    new_dist = 1.0 - _normalize(converted_queries) @ _normalize(converted_places).T
+
+    exact_top = np.argsort(exact_dist, axis=1)[:, :k]
+    new_top = np.argsort(new_dist, axis=1)[:, :k]
+    top1 = float(np.mean(exact_top[:, 0] == new_top[:, 0]))
+    recall = float(np.mean([len(set(e) & set(n)) / k for e, n in zip(exact_top.tolist(), new_top.tolist())]))
+    rows = np.arange(len(query_vectors))[:, None]
+    error = np.abs(exact_dist[rows, exact_top] - new_dist[rows, exact_top])
+    flipped = float(np.mean((exact_dist < threshold) != (new_dist < threshold)))
+
+    bytes_before = CLIP_DIM * 4
+    bytes_after = converted_places.shape[1] * (2 if EMBEDDING_STORAGE == "halfvec" else 4)
+    print("\n" + "=" * 60)
+    print(f"저장 형식: {EMBEDDING_STORAGE}({converted_places.shape[1]})  쿼리 {len(query_vectors)}개 / 장소 {len(place_vectors)}곳")
+    print("=" * 60)
+    print(f"{'top-1 일치율':<24}{top1:>12.4f}")
+    print(f"{'recall@' + str(k):<24}{recall:>12.4f}")
+    print(f"{'거리 오차 평균/최대':<24}{error.mean():>12.5f}{error.max():>12.5f}")
+    print(f"{'기준 통과 여부 변경':<24}{flipped:>12.4f}")
+    print(f"{'벡터당 바이트':<24}{bytes_before:>12}{bytes_after:>12}")
+    print("=" * 60 + "\n")
+
+def write_table(conn, table_name, ids, vectors):
+    """
+    새 형식 컬럼(embedding_new)에 변환된 벡터를 채운 뒤 기존 컬럼과 바꿔치기
+    (차원이 바뀌면 SQL 캐스트로는 못 바꿔서) - 못 채운 행이 하나라도 있으면 예외 -> 트랜잭션 전체 롤백
+    """
+    column_type = embedding_type().compile(dialect=conn.dialect)
+    conn.execute(text(f"LOCK TABLE {table_name} IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN IF EXISTS embedding_new"))
+    conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN embedding_new {column_type}"))
+    stmt = text(f"UPDATE {table_name} SET embedding_new = :embedding WHERE id = :id").bindparams(
+        bindparam("embedding", type_=embedding_type())
+    )
+    params = [{"id": int(i), "embedding": v.tolist()} for i, v in zip(ids, vectors)]
+    if params:
+        conn.execute(stmt, params)
+
+    unconverted = conn.execute(text(
+        f"SELECT count(*) FROM {table_name} WHERE embedding IS NOT NULL AND embedding_new IS NULL"
+    )).scalar()
+    if unconverted:
+        raise RuntimeError(f"{table_name} 에서 {unconverted}행이 변환되지 않았어 (마이그레이션 중에 추가된 행?) - 다시 실행해줘")
+
+    conn.execute(text(f"DROP INDEX IF EXISTS {_index_name(table_name)}"))
+    conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN embedding"))
+    conn.execute(text(f"ALTER TABLE {table_name} RENAME COLUMN embedding_new TO embedding"))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="임베딩 저장 형식(EMBEDDING_STORAGE / EMBEDDING_PCA_DIM)으로 기존 행 변환 + 정확도 리포트"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="리포트만 출력하고 DB는 그대로")
+    parser.add_argument("--queries", type=int, default=1000, help="리포트에 쓸 시드 사진 수")
+    args = parser.parse_args()
+
+    from app.services.recommend_service import SIMILARITY_THRESHOLD
+
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        originals = load_originals(conn)
+
+    place_ids, place_vectors, _ = originals["places"]
+    image_ids, image_vectors, _ = originals["place_images"]
+    if len(place_vectors) == 0:
+        print("💤 변환할 임베딩이 없어!")
+        sys.exit(0)
+
+    # 2. PCA 투영 학습 (사진별 임베딩 + 장소 centroid 전부)
+    projection = None
+    if EMBEDDING_PCA_DIM:
+        catalog = np.concatenate([v for v in (place_vectors, image_vectors) if len(v)])
+        components, explained = fit_projection(catalog, EMBEDDING_PCA_DIM)
+        projection = EmbeddingProjection(components, explained)
+        print(f"🧮 PCA {CLIP_DIM} -> {EMBEDDING_PCA_DIM}차원 학습 (벡터 {len(catalog)}개, 분산 설명률 {explained:.4f})")
+
+    converted = {
+        "places": convert(place_vectors, projection, EMBEDDING_STORAGE),
+        "place_images": convert(image_vectors, projection, EMBEDDING_STORAGE),
+    }
+
+    # 3. 정확도 리포트 (시드 사진 -> 장소 검색)
+    queries = image_vectors[:args.queries] if len(image_vectors) else place_vectors[:args.queries]
+    accuracy_report(
+        place_vectors, converted["places"],
+        queries, convert(queries, projection, EMBEDDING_STORAGE),
+        SIMILARITY_THRESHOLD,
+    )
+    if args.dry_run:
+        sys.exit(0)
+
+    # 4. 원본 백업 -> 투영 행렬 저장 -> 테이블 변환 (한 트랜잭션)
+    backup_path = save_backup(originals)
+    if backup_path:
+        print(f"💾 원본 임베딩 백업: {backup_path}")
+    if projection is not None:
+        projection.save(EMBEDDING_PCA_PATH)
+        print(f"💾 PCA 투영 저장: {EMBEDDING_PCA_PATH}")
+
+    ensure_catalog_version(engine)     # 변환하면서 카탈로그 버전이 올라가서 추천 캐시가 비워짐
+    with engine.begin() as conn:
+        write_table(conn, "places", place_ids, converted["places"])
+        write_table(conn, "place_images", image_ids, converted["place_images"])
+    print(f"✅ places {len(place_ids)}행 / place_images {len(image_ids)}행 -> {EMBEDDING_STORAGE}({EMBEDDING_DIM}) 변환 완료!")
+
+    # 5. 새 형식(opclass)으로 ANN 인덱스 다시 생성
+    rebuild_vector_index(engine)
+    print("🔁 벡터 인덱스 재생성 완료! (build_place_neighbors.py / PQ 인덱스를 쓰면 build_pq_index.py 도 다시 실행)")
@@ -0,0 +1,96 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, select, update, delete, or_
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Base, Place, PlaceImage, PlaceNeighbor, Visit, PlacePhoto, RoutePlace
+from app.db.vector_index import rebuild_vector_index
+from app.db.catalog_version import ensure_catalog_version
+from app.services.place_embeddings import refresh_place_embedding
+from app.services.place_neighbors import update_place_neighbors
+from app.services.travel_matrix import build_travel_matrix
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def migrate_place_images():
+    """
+    사진 1장 = Place 1행이던 예전 데이터를 장소 1행 + place_images N행 구조로 변환
+    1. 같은 이름/좌표의 Place 행들을 묶어서 가장 작은 id를 대표 장소로 남김
+    2. 묶인 행들의 사진/임베딩을 place_images 로 옮김
+    3. 방문 기록/사진/경로가 가리키던 id를 대표 장소로 바꾸고 나머지 행 삭제
+    4. 대표 장소의 centroid 임베딩 + 무드 다시 계산
+    """
+    from app.services.recommend_service import recommend_service
+
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    ensure_catalog_version(engine)
+    db = sessionmaker(bind=engine)()
+
+    try:
+        # 이미 사진이 옮겨진 장소는 건너뜀 (여러 번 실행해도 안전)
+        migrated_ids = set(db.scalars(select(PlaceImage.place_id).distinct()).all())
+
+        groups = {}
+        for place in db.scalars(select(Place).order_by(Place.id)).all():
+            groups.setdefault((place.name, place.latitude, place.longitude), []).append(place)
+
+        merged_count = 0
+        for (name, _, _), rows in groups.items():
+            canonical = rows[0]
+            if canonical.id in migrated_ids: continue
+
+            # 2. 사진 임베딩 옮기기
+            for row in rows:
+                if row.embedding is None: continue
+                db.add(PlaceImage(
+                    place_id=canonical.id,
+                    description=row.description,
+                    image_path=row.image_path,
+                    embedding=row.embedding,
+                    mood=row.mood
+                ))
+
+            # 3. 중복 행을 가리키던 기록들을 대표 장소로
+            duplicate_ids = [row.id for row in rows[1:]]
+            if duplicate_ids:
+                for model in (Visit, PlacePhoto, RoutePlace):
+                    db.execute(update(model).where(model.place_id.in_(duplicate_ids)).values(place_id=canonical.id))
+                # 비슷한 장소 목록은 아래에서 다시 계산
+                db.execute(delete(PlaceNeighbor).where(or_(
+                    PlaceNeighbor.place_id.in_(duplicate_ids), PlaceNeighbor.neighbor_id.in_(duplicate_ids)
+                )))
+                for row in rows[1:]:
+                    db.delete(row)
+            db.flush()
+
+            # 4. centroid 임베딩 + 무드
+            db.refresh(canonical)
+            refresh_place_embedding(canonical, recommend_service.analyze_mood)
+            merged_count += 1
+            print(f"  🧩 {name}: {len(rows)}행 -> 장소 1개 + 사진 {len(canonical.images)}장 ({canonical.mood})")
+
+        update_place_neighbors(db)
+        db.commit()
+        print(f"✅ 장소 {merged_count}곳 변환 완료!")
+    except Exception as e:
+        print(f"❌ 에러: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    # 벡터 수가 바뀌었으니 ANN 인덱스 재생성
+    rebuild_vector_index(engine)
+
+    # 중복 장소가 지워졌으니 이동 행렬도 다시
+    with sessionmaker(bind=engine)() as session:
+        build_travel_matrix(session)
+
+if __name__ == "__main__":
+    migrate_place_images()
@@ -0,0 +1,23 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine
+from app.db.vector_index import rebuild_vector_index, VECTOR_INDEX_TYPE
+
+# 1. 환경변수 로딩
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+if __name__ == "__main__":
+    # 대량 시딩 뒤에 실행: python rebuild_vector_index.py [hnsw|ivfflat|none]
+    index_type = sys.argv[1] if len(sys.argv) > 1 else VECTOR_INDEX_TYPE
+    engine = create_engine(DATABASE_URL)
+
+    print(f"🔨 places / place_images 벡터 인덱스 재생성 중... ({index_type})")
+    started = time.perf_counter()
+    rebuild_vector_index(engine, index_type)
+    print(f"✅ 재생성 완료! ({time.perf_counter() - started:.1f}초)")
@@ -9,6 +9,7 @@ from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 from app.db.models import Place
 from app.services.ai_service import ai_instance
+from app.services.embedding_projection import to_storage_vector
 
 load_dotenv()
 
@@ -37,6 +38,9 @@ def search_similar_place(image_filename):
         print("❌ 오류: AI가 이미지를 분석하지 못했습니다.")
         return
 
+    # DB 저장 형식이 PCA 로 줄인 벡터면 쿼리도 같은 투영으로
+    user_vector = to_storage_vector(user_vector)
+
     # 3. DB에서 가장 비슷한 장소 찾기
     db = SessionLocal()
     
@@ -8,8 +8,17 @@ sys.path.append(os.getcwd())
 
 from sqlalchemy import create_engine, text, select
 from sqlalchemy.orm import sessionmaker
-from app.db.models import Base, Place
+from app.db.models import Base, Place, PlaceImage
 from app.services.ai_service import ai_instance
+from app.services.recommend_service import recommend_service
+from app.services.place_embeddings import refresh_place_embedding
+from app.services.embedding_projection import to_storage_vector
+from app.services.place_neighbors import update_place_neighbors
+from app.services.travel_matrix import build_travel_matrix
+from app.db.mood_column import ensure_mood_column
+from app.db.vector_index import ensure_vector_index
+from app.db.geo_index import ensure_geo_index
+from app.db.catalog_version import ensure_catalog_version
 
 # 1. 환경변수 로딩
 load_dotenv()
@@ -49,6 +58,10 @@ def init_db():
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         conn.commit()
     Base.metadata.create_all(bind=engine)
+    ensure_mood_column(engine)
+    ensure_vector_index(engine)
+    ensure_geo_index(engine)
+    ensure_catalog_version(engine)
 
 # [핵심] 로컬 파일을 S3에 올리고 URL을 받아오는 함수
 def upload_file_to_s3(local_file_path, original_filename):
@@ -655,10 +668,15 @@ def seed_places():
             print(f"⏩패스: {common_name} (이미 DB에 있음)")
             continue
 
-        common_addr = place["addr"]
-        common_lat = place["lat"]
-        common_lng = place["lng"]
+        # 장소 정보는 한 번만 저장하고, 사진은 place_images 에 따로 쌓음
+        new_place = Place(
+            name=common_name,
+            address=place.get("addr"),
+            latitude=place["lat"],
+            longitude=place["lng"],
+        )
         
+        clip_vectors = []   # 무드/centroid 는 투영 전 CLIP 벡터로 계산
         for item in place["contents"]:
             image_file = item["img"]
             description = item["desc"]
@@ -681,27 +699,41 @@ def seed_places():
                     img_bytes = f.read()
                     vector = ai_instance.image_to_vector(img_bytes)
                 
-                # 3. DB 저장 (URL 저장!)
+                # 3. 사진 임베딩 추가 (URL 저장!)
                 if vector:
-                    new_place = Place(
-                        name=common_name,       
-                        address=common_addr,    
-                        latitude=common_lat,    
-                        longitude=common_lng,   
-                        description=description, 
-                        image_path=s3_url,   
-                        embedding=vector
-                    )
-                    db.add(new_place)
+                    new_place.images.append(PlaceImage(
+                        description=description,
+                        image_path=s3_url,
+                        embedding=to_storage_vector(vector),   # PCA/halfvec 저장 형식으로
+                        mood=recommend_service.analyze_mood(vector)
+                    ))
+                    clip_vectors.append(vector)
                     count += 1
                     print(f"  ✅ 저장 완료! (URL: {s3_url})")
                     
             except Exception as e:
                 print(f"⚠️ 에러: {e}")
+
+        # 4. 사진이 하나라도 있으면 대표 사진 + centroid 임베딩/무드 계산해서 장소 저장
+        if new_place.images:
+            new_place.description = new_place.images[0].description
+            new_place.image_path = new_place.images[0].image_path
+            refresh_place_embedding(new_place, recommend_service.analyze_mood, vectors=clip_vectors)
+            db.add(new_place)
     
     if count > 0:
         db.commit()
         print(f"🎉 {count}장의 사진을 S3에 올리고 DB에 저장했어!")
+
+        # 새 장소가 생겼으니 비슷한 장소 목록도 바뀐 부분만 갱신
+        updated = update_place_neighbors(db)
+        db.commit()
+        print(f"🔗 비슷한 장소 목록 {updated}곳 갱신")
+
+        # 장소 쌍 이동 거리/시간 행렬도 다시 (서버 워커들은 TRAVEL_MATRIX_CHECK_SECONDS 안에 새 버전을 읽음)
+        rebuilt, place_count = build_travel_matrix(db)
+        if rebuilt:
+            print(f"🧭 이동 행렬 갱신 (장소 {place_count}곳)")
     else:
         print("💤 새로 추가된 게 없네!")
         